@@ -0,0 +1,310 @@
+"""
+api.py
+------
+Headless HTTP API for the learning pipelines.
+
+Exposes quiz, skill-gap, recommendation, profile and tutor logic as
+endpoints so that the Streamlit UI or a mobile client can act as a thin
+client. State that is expensive to build is shared per process:
+- the question bank (quiz.get_question_bank)
+- the pooled ollama clients behind the LLM router (tutor.router)
+- the profile lock (profiler.profile_lock), which also serializes
+  profile updates across workers on POSIX systems
+
+Run with several workers to scale horizontally:
+    uvicorn api:app --workers 4
+"""
+
+from dataclasses import asdict
+from typing import Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from quiz import (
+    get_questions as get_bank_questions,
+    load_questions,
+    evaluate_quiz,
+    grade_questions
+)
+from item_stats import get_item_stats, get_all_item_stats, record_submission
+from skill_gap import analyze_skill_gaps
+from recommender import (
+    generate_learning_path,
+    recommend_resources,
+    generate_recommendation_summary
+)
+from profiler import (
+    load_profile,
+    update_profile,
+    get_learning_trends,
+    analyze_learning_behavior
+)
+from scheduler import record_quiz, due_items, due_today
+from tutor import (
+    get_structured_explanation,
+    generate_learning_roadmap,
+    explain_skill_gap,
+    get_llm_metrics,
+    get_backend_metrics,
+    GenerationCancelled,
+    GenerationTimeout,
+    GenerationFailed,
+    MalformedGeneration
+)
+
+
+app = FastAPI(title="AI Personalized Learning API")
+
+
+# =========================
+# REQUEST MODELS
+# =========================
+class GradeRequest(BaseModel):
+    # Every question that was asked; unanswered ones are graded as wrong
+    question_ids: List[int]
+    answers: Dict[int, str] = {}
+    answer_times: Dict[int, float] = {}
+
+
+class ScoresRequest(BaseModel):
+    scores: Dict[str, float]
+
+
+class TopicSkill(BaseModel):
+    score: float
+    level: Literal["Weak", "Medium", "Strong"]
+    needs_attention: Optional[bool] = None
+
+
+class SkillProfileRequest(BaseModel):
+    skill_profile: Dict[str, TopicSkill]
+
+    def as_skill_profile(self) -> Dict[str, Dict]:
+        """
+        The profile in the shape analyze_skill_gaps() returns.
+        """
+        return {
+            topic: {
+                "score": skill.score,
+                "level": skill.level,
+                "needs_attention": (
+                    skill.level == "Weak"
+                    if skill.needs_attention is None
+                    else skill.needs_attention
+                )
+            }
+            for topic, skill in self.skill_profile.items()
+        }
+
+
+class TutorRequest(BaseModel):
+    topic: str
+    level: str
+
+
+class DiagnosisRequest(BaseModel):
+    topic: str
+    score: float
+    level: str
+
+
+# =========================
+# HELPERS
+# =========================
+def _run_llm(generate, **kwargs):
+    """
+    Call a tutor function, mapping generation failures to HTTP errors.
+    """
+    try:
+        return generate(**kwargs)
+    except GenerationTimeout:
+        raise HTTPException(status_code=504, detail="LLM generation timed out")
+    except GenerationCancelled:
+        raise HTTPException(status_code=503, detail="LLM generation cancelled")
+    except MalformedGeneration:
+        raise HTTPException(status_code=502, detail="LLM returned malformed output")
+    except GenerationFailed:
+        raise HTTPException(status_code=503, detail="LLM backend unavailable")
+
+
+# =========================
+# QUIZ
+# =========================
+@app.get("/questions")
+def get_questions() -> List[Dict]:
+    """
+    Sample a diagnostic quiz. Answers are withheld; grade via /quiz/grade.
+    """
+    df = load_questions().drop(columns=["answer"])
+    return df.to_dict(orient="records")
+
+
+@app.post("/quiz/grade")
+def grade_quiz(request: GradeRequest) -> Dict[str, float]:
+    """
+    Grade a whole quiz. `question_ids` must list every question returned by
+    /questions, so skipped questions count as wrong instead of dropping out
+    of the topic scores and item statistics.
+    """
+    ids = request.question_ids
+    if not ids or len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=422, detail="question_ids must be unique and non-empty"
+        )
+    if not set(request.answers) <= set(ids):
+        raise HTTPException(
+            status_code=422, detail="Answers given for questions not in question_ids"
+        )
+
+    try:
+        asked = get_bank_questions(ids)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown question id")
+
+    record_submission(
+        grade_questions(asked, request.answers),
+        request.answer_times
+    )
+    return evaluate_quiz(asked, request.answers)
+
+
+@app.get("/items/stats")
+def all_item_stats() -> Dict[int, Dict]:
+    return get_all_item_stats()
+
+
+@app.get("/items/{question_id}/stats")
+def item_stats(question_id: int) -> Dict:
+    return get_item_stats(question_id)
+
+
+# =========================
+# SKILL GAPS & RECOMMENDATIONS
+# =========================
+@app.post("/skill-gaps")
+def skill_gaps(request: ScoresRequest) -> Dict[str, Dict]:
+    return analyze_skill_gaps(request.scores)
+
+
+@app.post("/learning-path")
+def learning_path(request: SkillProfileRequest) -> List[Dict]:
+    return [
+        dict(step)
+        for step in generate_learning_path(request.as_skill_profile())
+    ]
+
+
+@app.post("/resources")
+def resources(request: SkillProfileRequest) -> Dict[str, Dict]:
+    return {
+        topic: dict(resources)
+        for topic, resources in recommend_resources(
+            request.as_skill_profile()
+        ).items()
+    }
+
+
+@app.post("/summary")
+def summary(request: SkillProfileRequest) -> Dict[str, str]:
+    return {
+        "summary": generate_recommendation_summary(request.as_skill_profile())
+    }
+
+
+# =========================
+# PROFILE
+# =========================
+@app.get("/profile")
+def get_profile() -> Dict:
+    return load_profile()
+
+
+@app.post("/profile/attempts")
+def record_attempt(request: ScoresRequest) -> Dict:
+    """
+    Record a graded quiz attempt and return the updated profile.
+    """
+    skill_profile = analyze_skill_gaps(request.scores)
+    profile = update_profile(request.scores, skill_profile)
+    record_quiz(profile["student_id"], skill_profile)
+    return profile
+
+
+@app.get("/profile/trends")
+def profile_trends() -> Dict[str, Dict]:
+    profile = load_profile()
+    return {
+        "trends": get_learning_trends(profile),
+        "behavior": analyze_learning_behavior(profile)
+    }
+
+
+# =========================
+# REVIEWS
+# =========================
+@app.get("/reviews/due")
+def reviews_due_today() -> Dict[str, List[str]]:
+    return due_today()
+
+
+@app.get("/reviews/{student_id}/due")
+def student_reviews_due(student_id: str, limit: int = 10) -> List[Dict]:
+    return due_items(student_id, limit=limit)
+
+
+# =========================
+# AI TUTOR
+# =========================
+@app.post("/tutor/explanation")
+def tutor_explanation(request: TutorRequest) -> Dict:
+    explanation = _run_llm(
+        get_structured_explanation,
+        topic=request.topic,
+        level=request.level
+    )
+    return asdict(explanation)
+
+
+@app.post("/tutor/diagnosis")
+def tutor_diagnosis(request: DiagnosisRequest) -> Dict[str, str]:
+    text = _run_llm(
+        explain_skill_gap,
+        topic=request.topic,
+        score=request.score,
+        level=request.level
+    )
+    return {"diagnosis": text}
+
+
+@app.post("/tutor/roadmap")
+def tutor_roadmap(request: SkillProfileRequest) -> Dict[str, str]:
+    """
+    Generate a roadmap from the request's skill profile plus stored history.
+    """
+    profile = load_profile()
+    text = _run_llm(
+        generate_learning_roadmap,
+        skill_profile={
+            "skills": request.as_skill_profile(),
+            "trends": get_learning_trends(profile),
+            "attempts": profile["quiz_attempts"]
+        }
+    )
+    return {"roadmap": text}
+
+
+# =========================
+# OPERATIONS
+# =========================
+@app.get("/health")
+def health() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/metrics/llm")
+def llm_metrics() -> Dict:
+    return {
+        "generations": get_llm_metrics(),
+        "backends": get_backend_metrics()
+    }
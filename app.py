@@ -13,7 +13,10 @@ Responsibilities:
 - Fully offline, no API keys, no quotas
 """
 
+from datetime import datetime
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # =========================
 # IMPORT PROJECT MODULES
@@ -22,15 +25,21 @@ from quiz import run_quiz
 from skill_gap import analyze_skill_gaps, get_weak_topics
 from recommender import generate_learning_path, generate_recommendation_summary
 from tutor import (
-    get_ai_explanation,
+    get_structured_explanation,
     generate_learning_roadmap,
-    explain_skill_gap
+    explain_skill_gap,
+    begin_run,
+    GenerationCancelled,
+    GenerationTimeout,
+    GenerationFailed,
+    MalformedGeneration
 )
 from profiler import (
     update_profile,
     load_profile,
     get_learning_trends
 )
+from scheduler import record_quiz, due_items, next_due
 
 # =========================
 # PAGE CONFIG
@@ -54,6 +63,70 @@ st.markdown(
 
 st.divider()
 
+# =========================
+# LLM RUN TOKEN
+# =========================
+# Each rerun supersedes the previous one, so any generation still streaming
+# for this session is cancelled before new work starts.
+_ctx = get_script_run_ctx()
+run_token = begin_run(_ctx.session_id if _ctx else "local")
+
+
+def stream_llm(generate, show_partial=True, **kwargs):
+    """
+    Run a tutor generation, streaming partial output into a placeholder.
+
+    Updating the placeholder on every chunk also gives Streamlit a chance
+    to stop the generation when the user navigates away. Structured (JSON)
+    output is not readable mid-stream, so with show_partial=False only
+    progress is shown.
+    """
+    placeholder = st.empty()
+
+    def on_chunk(partial):
+        if show_partial:
+            placeholder.markdown(partial + " ▌")
+        else:
+            placeholder.caption(f"✍️ Writing... ({len(partial)} characters)")
+
+    try:
+        text = generate(cancel=run_token, on_chunk=on_chunk, **kwargs)
+    except GenerationTimeout as exc:
+        if show_partial:
+            placeholder.markdown(exc.partial)
+            st.warning("The AI took too long to respond. Showing partial output.")
+        else:
+            placeholder.empty()
+            st.warning("The AI took too long to respond. Please try again.")
+        return None
+    except GenerationCancelled:
+        placeholder.empty()
+        return None
+    except MalformedGeneration:
+        placeholder.empty()
+        st.warning("The AI returned an incomplete answer. Please try again.")
+        return None
+    except GenerationFailed:
+        placeholder.empty()
+        st.error("The AI tutor is unavailable right now. Please try again later.")
+        return None
+    placeholder.empty()
+    return text
+
+
+def render_explanation(explanation):
+    """
+    Render a TutorExplanation section by section.
+    """
+    st.markdown(f"**📘 Definition:** {explanation.definition}")
+    st.markdown(f"**🧠 Explanation:** {explanation.explanation}")
+    st.markdown(f"**🛠️ Where it is used:** {explanation.usage}")
+    if explanation.youtube_searches:
+        st.markdown("**▶️ YouTube searches:**")
+        for query in explanation.youtube_searches:
+            st.markdown(f"- {query}")
+
+
 # =========================
 # QUIZ FLOW
 # =========================
@@ -91,6 +164,16 @@ update_profile(scores, skill_profile)
 profile = load_profile()
 learning_trends = get_learning_trends(profile)
 
+# Schedule spaced-repetition reviews once per submission. The per-question
+# grading is only needed here, so it is dropped from the session afterwards.
+if not st.session_state.get("reviews_scheduled"):
+    record_quiz(
+        profile["student_id"],
+        skill_profile,
+        st.session_state.pop("quiz_graded", None)
+    )
+    st.session_state.reviews_scheduled = True
+
 # =========================
 # LEARNING TRENDS
 # =========================
@@ -126,8 +209,14 @@ for topic, trend in learning_trends.items():
     # Interactive button
     if st.button(f"Get AI advice for {topic}", key=f"trend_{topic}"):
         with st.spinner("AI analyzing your learning pattern..."):
-            advice = get_ai_explanation(topic, level)
-            st.success(advice)
+            advice = stream_llm(
+                get_structured_explanation,
+                show_partial=False,
+                topic=topic,
+                level=level
+            )
+            if advice:
+                render_explanation(advice)
 
     st.divider()
 
@@ -147,17 +236,41 @@ if weak_topics:
 
     if st.button("Explain My Weakness"):
         with st.spinner("AI is analyzing your learning gaps..."):
-            explanation = explain_skill_gap(
+            explanation = stream_llm(
+                explain_skill_gap,
                 topic=selected_topic,
                 score=skill_profile[selected_topic]["score"],
                 level=skill_profile[selected_topic]["level"]
             )
-            st.write(explanation)
+            if explanation:
+                st.write(explanation)
 else:
     st.success("🎉 No weak topics detected. You are doing great!")
 
 st.divider()
 
+# =========================
+# SPACED REPETITION
+# =========================
+st.header("🔁 Due for Review")
+
+due = due_items(profile["student_id"], limit=10)
+
+if due:
+    for item in due:
+        kind, _, name = item["item"].partition(":")
+        label = name if kind == "topic" else f"Question #{name}"
+        st.write(f"🔸 {label} (review interval: {item['interval']} day(s))")
+else:
+    upcoming = next_due(profile["student_id"])
+    if upcoming:
+        when = datetime.fromtimestamp(upcoming[1]).strftime("%d %b %Y, %H:%M")
+        st.info(f"Nothing to review right now. Next review: {when}.")
+    else:
+        st.info("Nothing to review yet.")
+
+st.divider()
+
 # =========================
 # RULE-BASED LEARNING PATH
 # =========================
@@ -180,14 +293,16 @@ st.header("🗺️ Personalized AI Learning Roadmap")
 
 if st.button("Generate My Learning Roadmap"):
     with st.spinner("AI is creating a personalized study plan..."):
-        roadmap = generate_learning_roadmap(
+        roadmap = stream_llm(
+            generate_learning_roadmap,
             skill_profile={
                 "skills": skill_profile,
                 "trends": learning_trends,
                 "attempts": profile["quiz_attempts"]
             }
         )
-        st.write(roadmap)
+        if roadmap:
+            st.write(roadmap)
 
 st.divider()
 
@@ -205,11 +320,14 @@ if weak_topics:
 
     if st.button("Ask AI Tutor"):
         with st.spinner("AI Tutor is explaining the topic..."):
-            explanation = get_ai_explanation(
+            explanation = stream_llm(
+                get_structured_explanation,
+                show_partial=False,
                 topic=tutor_topic,
                 level=skill_profile[tutor_topic]["level"]
             )
-            st.write(explanation)
+            if explanation:
+                render_explanation(explanation)
 
 st.divider()
 
@@ -0,0 +1,107 @@
+"""
+cohort_bench.py
+---------------
+Time the DuckDB cohort queries on a synthetic history dataset.
+
+Generates N attempts spread over many students and topics, writes them as
+Parquet parts in the history_export.SCHEMA layout, and times each query in
+cohort_queries.py. With --python-baseline, also times the per-student
+profiler functions over the same data for comparison.
+
+Usage:
+    python benchmarks/cohort_bench.py --attempts 2000000 --students 20000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+import cohort_queries  # noqa: E402
+from history_export import SCHEMA  # noqa: E402
+from profiler import analyze_learning_behavior, get_learning_trends  # noqa: E402
+from skill_gap import classify_skill  # noqa: E402
+
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+def make_dataset(export_dir, attempts, students, topics, parts, seed):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(datetime.utcnow(), "us") - np.timedelta64(30, "D")
+    per_part = attempts // parts
+
+    for part in range(parts):
+        scores = np.round(rng.uniform(0, 100, per_part), 2)
+        offsets = rng.integers(0, 30 * 24 * 3600 * 10**6, per_part)
+        table = pa.Table.from_pydict({
+            "student_id": rng.integers(0, students, per_part).astype(str),
+            "topic": np.char.add("Topic", rng.integers(0, topics, per_part).astype(str)),
+            "score": scores,
+            "level": [classify_skill(s) for s in scores],
+            "timestamp": start + offsets.astype("timedelta64[us]"),
+        }, schema=SCHEMA)
+        pq.write_table(table, Path(export_dir) / f"part-{part:04d}.parquet")
+
+
+def to_profiles(con):
+    """
+    Rebuild profiler-shaped dicts from the dataset for the Python baseline.
+    """
+    profiles = {}
+    rows = con.execute(
+        "SELECT student_id, topic, score, level, timestamp FROM attempts ORDER BY timestamp"
+    ).fetchall()
+    for student_id, topic, score, level, timestamp in rows:
+        topics = profiles.setdefault(student_id, {"student_id": student_id, "topics": {}})["topics"]
+        topics.setdefault(topic, {"history": []})["history"].append({
+            "score": score, "level": level, "timestamp": timestamp.isoformat()
+        })
+    return list(profiles.values())
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<28}{time.perf_counter() - start:>8.3f}s  ({len(result)} rows)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--attempts", type=int, default=2_000_000)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--topics", type=int, default=30)
+    parser.add_argument("--parts", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--python-baseline", action="store_true")
+    args = parser.parse_args()
+
+    export_dir = Path(tempfile.mkdtemp(prefix="cohort_bench_"))
+    make_dataset(export_dir, args.attempts, args.students, args.topics, args.parts, args.seed)
+    con = cohort_queries.connect(export_dir)
+
+    print(f"{args.attempts} attempts, {args.students} students, {args.topics} topics")
+    print("DuckDB:")
+    timed("learning_trends", lambda: cohort_queries.learning_trends(con))
+    timed("learning_behavior", lambda: cohort_queries.learning_behavior(con))
+    timed("declining_topics (7 days)", lambda: cohort_queries.declining_topics(con))
+    timed("average_score_by_day", lambda: cohort_queries.average_score_by_day(con))
+
+    if args.python_baseline:
+        profiles = to_profiles(con)
+        print("Python loop over profiles:")
+        timed("get_learning_trends", lambda: [get_learning_trends(p) for p in profiles])
+        timed("analyze_learning_behavior", lambda: [analyze_learning_behavior(p) for p in profiles])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+fake_ollama.py
+--------------
+Minimal stand-in for an ollama server, for router tests and benchmarks.
+
+Implements the endpoints the tutor and router use:
+- POST /api/chat   (streaming NDJSON or a single JSON reply)
+- GET  /api/tags   (used by health checks)
+- GET  /api/version
+
+Each server generates one reply at a time, like a single ollama process
+serving one model, and emits a token every --token-delay seconds.
+
+Usage:
+    python benchmarks/fake_ollama.py --port 11500 --token-delay 0.01
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+# =========================
+# REQUEST HANDLER
+# =========================
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set per server by make_server()
+    tokens = 50
+    token_delay = 0.01
+    generation_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # Pooled client connections are dropped when the client exits
+            pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "fake", "model": "fake"}]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "fake")
+        limit = request.get("options", {}).get("num_predict") or self.tokens
+        count = min(self.tokens, limit)
+
+        def chunk(content, done, **extra):
+            return {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": content},
+                "done": done,
+                **extra,
+            }
+
+        with self.generation_lock:
+            if not request.get("stream", True):
+                time.sleep(self.token_delay * count)
+                self._send_json(chunk(
+                    "word " * count, True,
+                    done_reason="stop", eval_count=count,
+                    prompt_eval_count=0, prompt_eval_duration=0,
+                ))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            try:
+                for _ in range(count):
+                    time.sleep(self.token_delay)
+                    self._write_chunk(chunk("word ", False))
+                self._write_chunk(chunk(
+                    "", True,
+                    done_reason="stop", eval_count=count,
+                    prompt_eval_count=0, prompt_eval_duration=0,
+                ))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client cancelled: stop generating, like ollama does
+                pass
+
+    def _write_chunk(self, payload):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+# =========================
+# SERVER HELPERS
+# =========================
+def make_server(port: int, tokens: int = 50, token_delay: float = 0.01) -> ThreadingHTTPServer:
+    """
+    Create a fake server with its own generation lock.
+    """
+    handler = type("Handler", (FakeOllamaHandler,), {
+        "tokens": tokens,
+        "token_delay": token_delay,
+        "generation_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_servers(count: int, base_port: int, **kwargs) -> List[ThreadingHTTPServer]:
+    """
+    Start `count` fake servers on consecutive ports in background threads.
+    """
+    servers = []
+    for i in range(count):
+        server = make_server(base_port + i, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.tokens, args.token_delay)
+    print(f"Fake ollama listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+load_test.py
+------------
+Concurrent end-to-end load test for app.py.
+
+Drives N simulated students through the real Streamlit script with
+streamlit.testing.v1.AppTest: open the app, answer the quiz, submit, and
+click the AI buttons. The LLM backend is replaced by a stub with a
+configurable latency, and the profile, item-stats and review-schedule files
+are redirected to a temporary directory.
+
+AppTest gives every session the same Streamlit session ID, so each
+simulated student is tagged in session state and gets its own LLM run key
+and its own quiz sampling seed. With a fixed --seed every session sees the
+same questions and picks the same answers on every run; only timings vary.
+
+Reports:
+- per-step latency percentiles
+- session and step throughput
+- profile update contention and lost updates
+- LLM call and wasted-token counters; a cancelled, timed-out or empty AI
+  reply counts as an error of its step
+
+Usage:
+    python benchmarks/load_test.py --sessions 20 --concurrency 10 --llm-latency 2
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import item_stats  # noqa: E402
+import profiler  # noqa: E402
+import quiz  # noqa: E402
+import scheduler  # noqa: E402
+import tutor  # noqa: E402
+from llm_router import Backend, LLMRouter  # noqa: E402
+
+
+APP_FILE = ROOT / "app.py"
+
+AI_BUTTONS = (
+    "Explain My Weakness",
+    "Generate My Learning Roadmap",
+    "Ask AI Tutor",
+)
+
+# Tutor function behind each AI button
+LLM_STEPS = {
+    "explain_skill_gap": "Explain My Weakness",
+    "generate_learning_roadmap": "Generate My Learning Roadmap",
+    "get_structured_explanation": "Ask AI Tutor",
+}
+
+# Session-state key identifying the simulated student of a script run
+SESSION_KEY = "load_test_session"
+
+
+# =========================
+# STUB LLM BACKEND
+# =========================
+def _fake_value(schema):
+    if schema.get("type") == "object":
+        return {
+            name: _fake_value(sub)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if schema.get("type") == "array":
+        return [_fake_value(schema.get("items", {}))]
+    return "stub"
+
+
+class FakeOllamaClient:
+    """
+    Stand-in for ollama.Client that streams a fixed reply.
+
+    The reply is split into `tokens` chunks spread evenly over `latency`
+    seconds. JSON-schema requests get a reply shaped like the schema.
+    """
+
+    def __init__(self, latency: float, tokens: int = 50):
+        self.latency = latency
+        self.tokens = tokens
+
+    def chat(self, model, messages, stream=False, format="", **kwargs):
+        if format:
+            words = [json.dumps(_fake_value(format))]
+        else:
+            words = ["word "] * self.tokens
+        delay = self.latency / max(len(words), 1)
+
+        def chunks():
+            for word in words:
+                time.sleep(delay)
+                yield {"message": {"content": word}, "done": False}
+            yield {"message": {"content": ""}, "done": True, "eval_count": len(words)}
+
+        return chunks()
+
+
+# =========================
+# INSTRUMENTATION
+# =========================
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.update_calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, step, seconds):
+        with self._lock:
+            self.latencies[step].append(seconds)
+
+    def error(self, step):
+        with self._lock:
+            self.errors[step] += 1
+
+
+def instrument_profile_updates(recorder: Recorder):
+    """
+    Wrap profiler.update_profile to time it and count calls. app.py
+    imports the function on every run, so it picks up the wrapper.
+    """
+    original = profiler.update_profile
+
+    def timed_update(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            recorder.add("profile_update", time.perf_counter() - start)
+            with recorder._lock:
+                recorder.update_calls += 1
+
+    profiler.update_profile = timed_update
+
+
+def _session_no() -> int:
+    return st.session_state[SESSION_KEY]
+
+
+def instrument_run_keys():
+    """
+    Key tutor run tokens by simulated student. Without this every AppTest
+    session shares one key and each run cancels the others' generations.
+    app.py imports begin_run on every run, so it picks up the wrapper.
+    """
+    original = tutor.begin_run
+
+    def begin_run(session_id):
+        return original(f"{session_id}:{_session_no()}")
+
+    tutor.begin_run = begin_run
+
+
+def instrument_llm_calls(recorder: Recorder):
+    """
+    Count a tutor call that raises or returns nothing as an error of the
+    step that triggered it. app.py swallows cancellations and timeouts, so
+    the AppTest result alone cannot tell them apart from success.
+    """
+    def checked(generate, step):
+        def wrapper(*args, **kwargs):
+            try:
+                result = generate(*args, **kwargs)
+            except BaseException:
+                recorder.error(step)
+                raise
+            if not result:
+                recorder.error(step)
+            return result
+        return wrapper
+
+    for name, step in LLM_STEPS.items():
+        setattr(tutor, name, checked(getattr(tutor, name), step))
+
+
+def seed_quiz_sampling(seed: int):
+    """
+    Make each session's quiz repeatable. Sampling uses numpy's global RNG,
+    so it is reseeded per session and serialized across threads.
+    """
+    original = quiz.sample_question_ids
+    lock = threading.Lock()
+
+    def sample_question_ids():
+        with lock:
+            np.random.seed(seed + _session_no())
+            return original()
+
+    quiz.sample_question_ids = sample_question_ids
+
+
+# =========================
+# SIMULATED STUDENT
+# =========================
+def _timed(recorder, step, action):
+    start = time.perf_counter()
+    at = action()
+    recorder.add(step, time.perf_counter() - start)
+    if at.exception:
+        recorder.error(step)
+    return at
+
+
+def _click(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button.click().run()
+    return at
+
+
+def run_session(session_no: int, recorder: Recorder, timeout: float, seed: int):
+    rng = random.Random(seed + session_no)
+    at = AppTest.from_file(str(APP_FILE), default_timeout=timeout)
+    at.session_state[SESSION_KEY] = session_no
+
+    at = _timed(recorder, "load", at.run)
+
+    for radio in at.radio:
+        radio.set_value(rng.choice(radio.options))
+    at = _timed(recorder, "submit", lambda: _click(at, "Submit Quiz"))
+
+    for label in AI_BUTTONS:
+        if any(button.label == label for button in at.button):
+            at = _timed(recorder, label, lambda: _click(at, label))
+
+
+# =========================
+# REPORT
+# =========================
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def build_report(recorder, sessions, elapsed, attempts_before, attempts_after):
+    steps = {}
+    for step, values in recorder.latencies.items():
+        steps[step] = {
+            "count": len(values),
+            "errors": recorder.errors.get(step, 0),
+            "mean_ms": statistics.mean(values) * 1000,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p90_ms": percentile(values, 90) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+
+    recorded = attempts_after - attempts_before
+    return {
+        "sessions": sessions,
+        "session_errors": recorder.errors.get("session", 0),
+        "elapsed_s": elapsed,
+        "sessions_per_s": sessions / elapsed,
+        "steps_per_s": sum(
+            len(v) for k, v in recorder.latencies.items() if k != "profile_update"
+        ) / elapsed,
+        "steps": steps,
+        "profile": {
+            "update_calls": recorder.update_calls,
+            "attempts_recorded": recorded,
+            "lost_updates": recorder.update_calls - recorded,
+        },
+        "llm": tutor.get_llm_metrics(),
+    }
+
+
+def print_report(report):
+    print(f"sessions: {report['sessions']} "
+          f"({report['session_errors']} failed) in {report['elapsed_s']:.1f}s "
+          f"({report['sessions_per_s']:.2f} sessions/s, "
+          f"{report['steps_per_s']:.2f} steps/s)")
+    print(f"{'step':<32}{'n':>6}{'err':>6}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}")
+    for step, s in report["steps"].items():
+        print(f"{step:<32}{s['count']:>6}{s['errors']:>6}"
+              f"{s['mean_ms']:>10.0f}{s['p50_ms']:>10.0f}"
+              f"{s['p90_ms']:>10.0f}{s['p99_ms']:>10.0f}")
+    print("profile:", report["profile"])
+    print("llm:", report["llm"])
+
+
+# =========================
+# MAIN
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=1.0,
+                        help="seconds per stubbed LLM reply")
+    parser.add_argument("--timeout", type=float, default=120,
+                        help="per-step AppTest timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="load_test_"))
+    profiler.DATA_DIR = tmp_dir
+    profiler.PROFILE_FILE = tmp_dir / "student_profile.json"
+    item_stats.DATA_DIR = tmp_dir
+    item_stats.STATS_FILE = tmp_dir / "item_stats.db"
+    scheduler.DATA_DIR = tmp_dir
+    scheduler.SCHEDULE_FILE = tmp_dir / "review_schedule.db"
+
+    tutor.router = LLMRouter([
+        Backend("stub", client=FakeOllamaClient(args.llm_latency))
+    ])
+
+    recorder = Recorder()
+    instrument_profile_updates(recorder)
+    instrument_run_keys()
+    instrument_llm_calls(recorder)
+    seed_quiz_sampling(args.seed)
+    attempts_before = profiler.load_profile()["quiz_attempts"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(run_session, n, recorder, args.timeout, args.seed)
+            for n in range(args.sessions)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                recorder.error("session")
+    elapsed = time.perf_counter() - start
+
+    attempts_after = profiler.load_profile()["quiz_attempts"]
+    report = build_report(
+        recorder, args.sessions, elapsed, attempts_before, attempts_after
+    )
+    print_report(report)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+prefill_bench.py
+----------------
+Compare prompt prefill cost of the old single-message prompts against the
+system-prefix + user-suffix prompts in tutor.py.
+
+Reports ollama's prompt_eval_count and prompt_eval_duration per call.
+Requires a running ollama server with tutor.MODEL pulled; only the first
+host in OLLAMA_HOSTS is used.
+
+Usage:
+    python benchmarks/prefill_bench.py --rounds 5
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tutor  # noqa: E402
+
+
+TOPICS = [("Basics", "Weak"), ("Loops", "Medium"), ("Functions", "Weak")]
+
+
+# =========================
+# BASELINE PROMPT
+# =========================
+def legacy_tutor_prompt(topic: str, level: str) -> list:
+    """
+    The tutor prompt as it was built before the prefix split.
+    """
+    prompt = f"""
+You are an expert programming tutor.
+
+Topic: {topic}
+Student level: {level}
+
+Explain the topic clearly.
+
+Include:
+1. Definition (1–2 lines)
+2. Brief explanation with example
+3. Where it is used
+4. YouTube search suggestions
+
+Format:
+Definition:
+Explanation:
+Usage:
+YouTube searches:
+"""
+    return [{"role": "user", "content": prompt}]
+
+
+# =========================
+# MEASUREMENT
+# =========================
+def measure(build, rounds: int) -> dict:
+    durations = []
+    counts = []
+
+    for _ in range(rounds):
+        for topic, level in TOPICS:
+            # Always the first backend, so the prompt cache is shared
+            response = tutor.router.backends[0].client.chat(
+                model=tutor.MODEL,
+                messages=build(topic, level),
+                keep_alive=tutor.KEEP_ALIVE,
+                # Only the prefill matters here
+                options={"num_predict": 1},
+            )
+            durations.append(response["prompt_eval_duration"] / 1e6)
+            counts.append(response["prompt_eval_count"])
+
+    return {
+        "calls": len(durations),
+        "mean_prefill_ms": statistics.mean(durations),
+        "median_prefill_ms": statistics.median(durations),
+        "mean_prompt_tokens_evaluated": statistics.mean(counts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Warm the model so load time is not counted against the first variant
+    measure(tutor.build_tutor_prompt, 1)
+
+    results = {
+        "before (single user message)": measure(legacy_tutor_prompt, args.rounds),
+        "after (shared system prefix)": measure(tutor.build_tutor_prompt, args.rounds),
+    }
+
+    for name, stats in results.items():
+        print(name)
+        for key, value in stats.items():
+            print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+recommender_bench.py
+--------------------
+Compare the memoized recommender against per-call construction.
+
+Builds random skill profiles for many students over many topics and calls
+every recommendation function several times per student, the way a
+Streamlit session re-runs them on each interaction.
+
+Usage:
+    python benchmarks/recommender_bench.py --students 2000 --topics 1000 --reruns 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import recommender  # noqa: E402
+
+
+# =========================
+# BASELINE (PER-CALL CONSTRUCTION)
+# =========================
+def legacy_learning_path(skill_profile, topic_sequence):
+    learning_path = []
+    for topic in topic_sequence:
+        if topic not in skill_profile:
+            continue
+        level = skill_profile[topic]["level"]
+        if level == "Weak":
+            learning_path.extend([
+                {"topic": topic, "action": "Revise fundamentals", "reason": "Low quiz performance"},
+                {"topic": topic, "action": "Practice basic problems", "reason": "Strengthen core understanding"},
+                {"topic": topic, "action": "Re-attempt assessment", "reason": "Validate improvement"},
+            ])
+        elif level == "Medium":
+            learning_path.append({"topic": topic, "action": "Practice intermediate problems", "reason": "Partial understanding detected"})
+        else:
+            learning_path.append({"topic": topic, "action": "Proceed to next topic", "reason": "Strong understanding confirmed"})
+    return learning_path
+
+
+def legacy_resources(skill_profile):
+    recommendations = {}
+    for topic, data in skill_profile.items():
+        level = data["level"]
+        if level == "Weak":
+            recommendations[topic] = {"recommended_level": "Beginner", "focus": "Concept clarity and examples"}
+        elif level == "Medium":
+            recommendations[topic] = {"recommended_level": "Intermediate", "focus": "Practice and problem-solving"}
+        else:
+            recommendations[topic] = {"recommended_level": "Advanced", "focus": "Application and optimization"}
+    return recommendations
+
+
+def legacy_summary(skill_profile):
+    weak = [t for t, d in skill_profile.items() if d["level"] == "Weak"]
+    strong = [t for t, d in skill_profile.items() if d["level"] == "Strong"]
+    summary = []
+    if weak:
+        summary.append(f"Immediate focus needed on {', '.join(weak)} due to weak conceptual clarity.")
+    if strong:
+        summary.append(f"You show strong understanding in {', '.join(strong)}. These can be leveraged to learn advanced topics faster.")
+    summary.append("Follow the AI roadmap consistently and revise weak topics with hands-on practice.")
+    return " ".join(summary)
+
+
+def legacy_explanation(topic, level, trend):
+    return f"""
+This recommendation was generated because:
+- Topic: {topic}
+- Skill level: {level}
+- Learning trend: {trend}
+"""
+
+
+# =========================
+# WORKLOAD
+# =========================
+def make_profiles(students, topics, per_student, seed):
+    rng = random.Random(seed)
+    names = [f"Topic{i}" for i in range(topics)]
+    profiles = []
+    for _ in range(students):
+        chosen = rng.sample(names, min(per_student, topics))
+        profiles.append({
+            topic: {"score": 0, "level": rng.choice(recommender.LEVELS)}
+            for topic in chosen
+        })
+    return names, profiles
+
+
+def run_legacy(profiles, sequence, reruns):
+    for profile in profiles:
+        for _ in range(reruns):
+            legacy_learning_path(profile, sequence)
+            legacy_resources(profile)
+            legacy_summary(profile)
+            for topic, data in profile.items():
+                legacy_explanation(topic, data["level"], "Stagnant")
+
+
+def run_memoized(profiles, reruns):
+    for profile in profiles:
+        for _ in range(reruns):
+            recommender.generate_learning_path(profile)
+            recommender.recommend_resources(profile)
+            recommender.generate_recommendation_summary(profile)
+            for topic, data in profile.items():
+                recommender.explain_recommendation(topic, data["level"], "Stagnant")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--per-student", type=int, default=20,
+                        help="topics in each student's profile")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names, profiles = make_profiles(
+        args.students, args.topics, args.per_student, args.seed
+    )
+    # Let the learning path cover every topic, not just the three defaults
+    recommender.DEFAULT_TOPIC_SEQUENCE = tuple(names)
+
+    start = time.perf_counter()
+    run_legacy(profiles, names, args.reruns)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_memoized(profiles, args.reruns)
+    memoized = time.perf_counter() - start
+
+    calls = args.students * args.reruns
+    print(f"{args.students} students x {args.reruns} reruns, "
+          f"{args.per_student} of {args.topics} topics each")
+    print(f"  per-call construction: {legacy:.3f}s ({legacy / calls * 1e6:.1f} µs/rerun)")
+    print(f"  memoized templates:    {memoized:.3f}s ({memoized / calls * 1e6:.1f} µs/rerun)")
+    print(f"  speedup: {legacy / memoized:.1f}x")
+    print(f"  template cache: {recommender.topic_template.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+router_bench.py
+---------------
+Measure aggregate tokens/sec through tutor.call_llm as backends are added.
+
+For each pool size, starts that many fake ollama servers (see
+fake_ollama.py), points the router at them, and fires concurrent tutor
+requests across several topics. Reports throughput and the router's
+per-backend counters.
+
+Usage:
+    python benchmarks/router_bench.py --backends 1 2 4 --requests 64 --concurrency 16
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import tutor  # noqa: E402
+from fake_ollama import start_servers  # noqa: E402
+from llm_router import LLMRouter  # noqa: E402
+
+
+TOPICS = ["Basics", "Loops", "Functions", "Strings", "Lists", "Dicts"]
+
+
+def run(backends, base_port, requests, concurrency, tokens, token_delay):
+    servers = start_servers(
+        backends, base_port, tokens=tokens, token_delay=token_delay
+    )
+    tutor.router = LLMRouter.from_hosts(
+        ",".join(f"http://127.0.0.1:{base_port + i}" for i in range(backends)),
+        timeout=tutor.REQUEST_TIMEOUT
+    )
+
+    before = tutor.get_llm_metrics()["generated_tokens"]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(
+            lambda i: tutor.get_ai_explanation(TOPICS[i % len(TOPICS)], "Weak"),
+            range(requests)
+        ))
+    elapsed = time.perf_counter() - start
+    generated = tutor.get_llm_metrics()["generated_tokens"] - before
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+    return generated / elapsed, tutor.router.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--base-port", type=int, default=11500)
+    args = parser.parse_args()
+
+    baseline = None
+    for count in args.backends:
+        # Fresh ports per run so sockets from the last run do not collide
+        base_port = args.base_port + 100 * count
+        tokens_per_s, metrics = run(
+            count, base_port, args.requests, args.concurrency,
+            args.tokens, args.token_delay
+        )
+        baseline = baseline or tokens_per_s
+        print(f"{count} backend(s): {tokens_per_s:.0f} tokens/s "
+              f"({tokens_per_s / baseline:.2f}x)")
+        for backend in metrics:
+            print(f"    {backend['host']}: requests={backend['requests']} "
+                  f"max_outstanding={backend['max_outstanding']} "
+                  f"tokens={backend['tokens']} errors={backend['errors']}")
+
+
+if __name__ == "__main__":
+    main()
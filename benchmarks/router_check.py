@@ -0,0 +1,206 @@
+"""
+router_check.py
+---------------
+Repeatable behaviour check for the LLM router against fake ollama servers.
+
+Verifies that:
+- a request routed to a dead backend fails over to a live one, is counted
+  once in the tutor metrics, and marks the dead backend unhealthy
+- a backend that comes back is marked healthy by check_health() and
+  receives requests again
+- a backend that times out while busy counts an error but stays healthy
+- acquire() picks the backend with the fewest outstanding requests unless
+  the affinity backend is within AFFINITY_SLACK of it
+
+Exits non-zero if any check fails.
+
+Usage:
+    python benchmarks/router_check.py --base-port 11700
+"""
+
+import argparse
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import tutor  # noqa: E402
+from fake_ollama import start_servers  # noqa: E402
+from llm_router import AFFINITY_SLACK, LLMRouter, _affinity_score  # noqa: E402
+
+
+failures = []
+
+
+def check(condition, message):
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def affinity_key_for(router, host):
+    """
+    First key of the form "key-N" whose rendezvous hash prefers `host`.
+    """
+    hosts = [backend.host for backend in router.backends]
+    n = 0
+    while True:
+        key = f"key-{n}"
+        if max(hosts, key=lambda h: _affinity_score(key, h)) == host:
+            return key
+        n += 1
+
+
+def metrics_delta(before):
+    after = tutor.get_llm_metrics()
+    return {name: after[name] - before[name] for name in after}
+
+
+# =========================
+# CHECKS
+# =========================
+def check_failover_and_recovery(base_port):
+    live_host = f"http://127.0.0.1:{base_port}"
+    dead_host = f"http://127.0.0.1:{base_port + 1}"
+    servers = start_servers(1, base_port, tokens=5, token_delay=0.001)
+
+    tutor.router = LLMRouter.from_hosts(
+        f"{live_host},{dead_host}", timeout=tutor.REQUEST_TIMEOUT
+    )
+    live, dead = tutor.router.backends
+
+    # Failover: the first request prefers the dead backend
+    before = tutor.get_llm_metrics()
+    key = affinity_key_for(tutor.router, dead_host)
+    replies = [tutor.call_llm("hello", affinity=key) for _ in range(5)]
+    delta = metrics_delta(before)
+
+    check(all(replies), "every request through a dead backend got a reply")
+    check(delta["calls"] == 5, f"5 requests counted as 5 calls (got {delta['calls']})")
+    check(delta["completed"] == 5, f"5 calls completed (got {delta['completed']})")
+    check(delta["failed"] == 0, f"no call recorded as failed (got {delta['failed']})")
+    check(dead.errors == 1, f"dead backend has 1 error (got {dead.errors})")
+    check(not dead.healthy, "dead backend marked unhealthy")
+    check(live.requests == 5, f"live backend served 5 requests (got {live.requests})")
+
+    # Health check keeps a still-dead backend out of rotation
+    tutor.router.check_health()
+    check(not dead.healthy, "health check keeps a dead backend unhealthy")
+
+    # Recovery: the backend comes up and the next health check restores it
+    servers += start_servers(1, base_port + 1, tokens=5, token_delay=0.001)
+    tutor.router.check_health()
+    check(dead.healthy, "revived backend marked healthy by check_health()")
+
+    served_before = dead.requests
+    tutor.call_llm("hello", affinity=key)
+    check(dead.requests == served_before + 1,
+          "revived backend receives its affinity traffic again")
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+    # Every backend down: the request fails and is recorded once. Fresh
+    # ports, since pooled keep-alive connections outlive server_close().
+    tutor.router = LLMRouter.from_hosts(
+        f"http://127.0.0.1:{base_port + 2},http://127.0.0.1:{base_port + 3}",
+        timeout=tutor.REQUEST_TIMEOUT
+    )
+    before = tutor.get_llm_metrics()
+    try:
+        tutor.call_llm("hello", affinity=key)
+        raised = False
+    except Exception:
+        raised = True
+    delta = metrics_delta(before)
+    check(raised, "request fails when every backend is down")
+    check(delta["calls"] == 1 and delta["failed"] == 1,
+          f"failed request counted once (calls={delta['calls']}, "
+          f"failed={delta['failed']})")
+    check(all(b.errors == 1 for b in tutor.router.backends),
+          "each refusing backend has 1 error")
+
+
+def check_busy_backend_stays_healthy(base_port):
+    # One slow token per second against a 0.3s read timeout
+    servers = start_servers(1, base_port, tokens=3, token_delay=1.0)
+    tutor.router = LLMRouter.from_hosts(
+        f"http://127.0.0.1:{base_port}",
+        timeout=httpx.Timeout(0.3, connect=1)
+    )
+    (slow,) = tutor.router.backends
+
+    before = tutor.get_llm_metrics()
+    try:
+        tutor.call_llm("hello")
+        timed_out = False
+    except tutor.GenerationTimeout:
+        timed_out = True
+    delta = metrics_delta(before)
+
+    check(timed_out, "read timeout surfaces as GenerationTimeout")
+    check(delta["timed_out"] == 1, f"timeout recorded once (got {delta['timed_out']})")
+    check(slow.errors == 1, f"slow backend has 1 error (got {slow.errors})")
+    check(slow.healthy, "slow backend stays healthy")
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def check_least_outstanding(base_port):
+    hosts = [f"http://127.0.0.1:{base_port + i}" for i in range(2)]
+    servers = start_servers(2, base_port, tokens=5, token_delay=0.001)
+    router = LLMRouter.from_hosts(",".join(hosts))
+    a, b = router.backends
+    key_a = affinity_key_for(router, a.host)
+
+    with ExitStack() as stack:
+        first = stack.enter_context(router.acquire())
+        second = stack.enter_context(router.acquire())
+        check({first.host, second.host} == {a.host, b.host},
+              "two requests without affinity land on different backends")
+
+    with ExitStack() as stack:
+        for _ in range(AFFINITY_SLACK):
+            stack.enter_context(router.acquire(key_a))
+        chosen = stack.enter_context(router.acquire(key_a))
+        check(chosen is a,
+              f"affinity backend kept while within slack ({AFFINITY_SLACK})")
+        chosen = stack.enter_context(router.acquire(key_a))
+        check(chosen is b,
+              "request moves to the least loaded backend beyond the slack")
+
+    check(a.outstanding == 0 and b.outstanding == 0,
+          "outstanding counters return to zero")
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+# =========================
+# MAIN
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-port", type=int, default=11700)
+    args = parser.parse_args()
+
+    check_failover_and_recovery(args.base_port)
+    check_busy_backend_stays_healthy(args.base_port + 5)
+    check_least_outstanding(args.base_port + 10)
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("all router checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+session_memory.py
+-----------------
+Measure quiz state held per Streamlit session.
+
+Simulates N sessions that have each sampled and answered a quiz, once with
+the old layout (a sampled DataFrame per session) and once with the current
+layout (an array of question ids), and reports bytes retained per session
+as seen by tracemalloc.
+
+Usage:
+    python benchmarks/session_memory.py --sessions 1000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quiz import (  # noqa: E402
+    get_question_bank,
+    get_questions,
+    load_questions,
+    sample_question_ids,
+)
+
+
+# =========================
+# SIMULATED SESSIONS
+# =========================
+def _answers(df) -> dict:
+    # Widgets hand back the option object from the bank, so answers only
+    # hold references to shared strings.
+    return {int(row["id"]): row["option1"] for _, row in df.iterrows()}
+
+
+def before_session() -> dict:
+    df = load_questions()
+    return {
+        "quiz_df": df,
+        "quiz_answers": _answers(df),
+        "quiz_submitted": True,
+    }
+
+
+def after_session() -> dict:
+    ids = sample_question_ids()
+    return {
+        "quiz_ids": ids,
+        "quiz_answers": _answers(get_questions(ids)),
+        "quiz_submitted": True,
+    }
+
+
+def measure(make_session, sessions: int) -> int:
+    """
+    Return bytes retained by `sessions` simulated session states.
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+
+    states = [make_session() for _ in range(sessions)]
+
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(
+        stat.size_diff for stat in snapshot.compare_to(baseline, "filename")
+    )
+    del states
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Load the shared bank and its index up front; it is paid once per
+    # process, not per session.
+    get_question_bank()
+    after_session()
+
+    for name, make_session in (
+        ("before (DataFrame per session)", before_session),
+        ("after (question ids per session)", after_session),
+    ):
+        total = measure(make_session, args.sessions)
+        print(name)
+        print(f"  total: {total / 1024:.1f} KiB for {args.sessions} sessions")
+        print(f"  per session: {total / args.sessions:.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+cohort_queries.py
+-----------------
+Vectorized cohort analytics over the exported history dataset.
+
+Responsibilities:
+- Reproduce profiler.get_learning_trends and
+  profiler.analyze_learning_behavior for every student at once
+- Answer class-level questions (declining topics, daily averages)
+
+All queries run in DuckDB over the Parquet files written by
+history_export.py and return pandas DataFrames.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+import pandas as pd
+
+from history_export import EXPORT_DIR, SCHEMA
+
+
+# Same thresholds as profiler.get_learning_trends / analyze_learning_behavior
+TREND_DELTA = 5
+FAST_LEARNER_RATE = 5
+
+
+# =========================
+# CONNECTION
+# =========================
+def connect(export_dir: Path = EXPORT_DIR) -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory DuckDB connection with an `attempts` view over the
+    exported Parquet parts.
+
+    Before the first export there are no parts, and read_parquet() fails on
+    an empty glob, so `attempts` is an empty table with the export schema.
+    """
+    con = duckdb.connect()
+    if not any(Path(export_dir).glob("*.parquet")):
+        con.register("attempts", SCHEMA.empty_table())
+        return con
+
+    pattern = str(Path(export_dir) / "*.parquet").replace("'", "''")
+    con.execute(f"CREATE VIEW attempts AS SELECT * FROM read_parquet('{pattern}')")
+    return con
+
+
+# =========================
+# PER-STUDENT ANALYTICS
+# =========================
+_TRENDS_SQL = f"""
+WITH ranked AS (
+    SELECT
+        student_id, topic, score,
+        row_number() OVER (
+            PARTITION BY student_id, topic ORDER BY timestamp DESC
+        ) AS rn,
+        count(*) OVER (PARTITION BY student_id, topic) AS attempts
+    FROM attempts
+    {{where}}
+),
+pairs AS (
+    SELECT
+        student_id, topic, any_value(attempts) AS attempts,
+        max(score) FILTER (WHERE rn = 1) - max(score) FILTER (WHERE rn = 2) AS diff
+    FROM ranked
+    WHERE rn <= 2
+    GROUP BY student_id, topic
+)
+SELECT
+    student_id, topic, attempts, diff,
+    CASE
+        WHEN attempts < 2 THEN 'Not enough data'
+        WHEN diff > {TREND_DELTA} THEN 'Improving'
+        WHEN diff < -{TREND_DELTA} THEN 'Declining'
+        ELSE 'Stagnant'
+    END AS trend
+FROM pairs
+ORDER BY student_id, topic
+"""
+
+
+def learning_trends(
+    con: duckdb.DuckDBPyConnection,
+    since: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    get_learning_trends() for every (student, topic): compares the last two
+    attempts.
+
+    Args:
+        since (datetime): only consider attempts at or after this time
+
+    Returns:
+        DataFrame: student_id, topic, attempts, diff, trend
+    """
+    where, params = "", []
+    if since is not None:
+        where, params = "WHERE timestamp >= ?", [since]
+    return con.execute(_TRENDS_SQL.format(where=where), params).df()
+
+
+def learning_behavior(con: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    """
+    analyze_learning_behavior() for every (student, topic): average change
+    per attempt between the first and latest score.
+
+    Returns:
+        DataFrame: student_id, topic, attempts, improvement_rate, behavior
+    """
+    return con.execute(f"""
+        WITH spans AS (
+            SELECT
+                student_id, topic,
+                count(*) AS attempts,
+                (arg_max(score, timestamp) - arg_min(score, timestamp))
+                    / count(*) AS improvement_rate
+            FROM attempts
+            GROUP BY student_id, topic
+        )
+        SELECT
+            student_id, topic, attempts, improvement_rate,
+            CASE
+                WHEN attempts < 3 THEN 'Insufficient data'
+                WHEN improvement_rate > {FAST_LEARNER_RATE} THEN 'Fast learner'
+                WHEN improvement_rate > 0 THEN 'Slow but improving'
+                ELSE 'Needs intervention'
+            END AS behavior
+        FROM spans
+        ORDER BY student_id, topic
+    """).df()
+
+
+# =========================
+# COHORT QUESTIONS
+# =========================
+def declining_topics(
+    con: duckdb.DuckDBPyConnection,
+    days: int = 7,
+    now: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Topics declining across the class over the last `days` days.
+
+    A student counts as declining on a topic when their last two attempts
+    in the window drop by more than TREND_DELTA.
+
+    Returns:
+        DataFrame: topic, students, declining_students, declining_share
+    """
+    now = now or datetime.utcnow()
+    con.register(
+        "window_trends",
+        learning_trends(con, since=now - timedelta(days=days))
+    )
+
+    try:
+        return con.execute("""
+            SELECT
+                topic,
+                count(*) FILTER (WHERE trend != 'Not enough data') AS students,
+                count(*) FILTER (WHERE trend = 'Declining') AS declining_students,
+                declining_students / nullif(students, 0) AS declining_share
+            FROM window_trends
+            GROUP BY topic
+            ORDER BY declining_share DESC NULLS LAST, topic
+        """).df()
+    finally:
+        con.unregister("window_trends")
+
+
+def average_score_by_day(con: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    """
+    Average score and attempt count per topic per day.
+
+    Returns:
+        DataFrame: topic, day, avg_score, attempts
+    """
+    return con.execute("""
+        SELECT
+            topic,
+            CAST(timestamp AS DATE) AS day,
+            avg(score) AS avg_score,
+            count(*) AS attempts
+        FROM attempts
+        GROUP BY topic, day
+        ORDER BY topic, day
+    """).df()
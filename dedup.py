@@ -0,0 +1,151 @@
+"""
+dedup.py
+--------
+Near-duplicate detection for question text.
+
+Responsibilities:
+- Compute MinHash signatures over character shingles
+- Index signatures with banded LSH so a lookup touches only a handful of
+  buckets instead of every stored question
+- Confirm LSH candidates by estimated Jaccard similarity
+"""
+
+import re
+import zlib
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+# =========================
+# CONFIG
+# =========================
+NUM_PERM = 60
+BANDS = 20          # 20 bands x 3 rows: candidates from ~0.37 similarity
+
+# Question stems are a handful of words, too short for word shingles: a
+# single added word changes most word 3-grams. Tuned on the bank with exact
+# Jaccard over 5-character shingles: rewordings such as "What is a
+# variable?" / "What is a variable in Python?" score 0.62 and "...stores
+# decimals?" / "...stores decimal values?" 0.73, while the closest pair of
+# distinct bank questions ("output of print(5+3)" / "output of range(3)")
+# scores 0.49.
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.55
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# a, b < 2**31 and 32-bit shingle hashes keep a * x + b inside uint64
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+_TRAILING_PUNCT_RE = re.compile(r"[?.!]+$")
+
+
+# =========================
+# SIGNATURES
+# =========================
+def normalize(text: str) -> str:
+    """
+    Lowercase, drop closing punctuation and collapse whitespace. Code
+    symbols are kept, since they often are what tells questions apart.
+    """
+    return " ".join(_TRAILING_PUNCT_RE.sub("", text.lower().strip()).split())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """
+    Character n-grams of normalized text (whole text if it is shorter).
+
+    The text is padded with a space on both sides so the first and last
+    words form shingles of their own.
+    """
+    padded = f" {normalize(text)} "
+    if len(padded) <= size:
+        return [padded]
+    return [padded[i:i + size] for i in range(len(padded) - size + 1)]
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    MinHash signature of NUM_PERM uint64 values.
+    """
+    hashes = np.array(
+        [zlib.crc32(s.encode("utf-8")) for s in shingles(text)],
+        dtype=np.uint64
+    )
+    permuted = (
+        (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None])
+        % _MERSENNE_PRIME
+    ) & _MAX_HASH
+    return permuted.min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+# =========================
+# LSH INDEX
+# =========================
+class MinHashLSH:
+    """
+    Banded LSH index over MinHash signatures.
+
+    Lookups cost BANDS dictionary probes plus a signature comparison per
+    candidate, independent of how many questions are indexed.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._rows = NUM_PERM // BANDS
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [
+            {} for _ in range(BANDS)
+        ]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self._rows:(i + 1) * self._rows].tobytes()
+            for i in range(BANDS)
+        ]
+
+    def insert(self, key: Hashable, signature: np.ndarray) -> None:
+        self._signatures[key] = signature
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(key)
+
+    def query(self, signature: np.ndarray) -> Optional[Hashable]:
+        """
+        Return the key of a stored near-duplicate, or None.
+        """
+        seen = set()
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            for key in bucket.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if similarity(signature, self._signatures[key]) >= self.threshold:
+                    return key
+        return None
+
+    def add_if_new(self, key: Hashable, text: str) -> bool:
+        """
+        Index `text` unless a near-duplicate is already stored.
+
+        Returns:
+            bool: True if the text was added
+        """
+        signature = minhash(text)
+        if self.query(signature) is not None:
+            return False
+        self.insert(key, signature)
+        return True
@@ -0,0 +1,143 @@
+"""
+history_export.py
+-----------------
+Exports profiler history to a columnar Parquet dataset.
+
+Responsibilities:
+- Flatten profile["topics"][topic]["history"] into rows of
+  (student_id, topic, score, level, timestamp)
+- Append only entries newer than the last export, per student
+- Write each export as a new part file under data/history/
+
+Usage:
+    python history_export.py
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from profiler import DATA_DIR, load_profile
+
+
+# =========================
+# FILE PATHS
+# =========================
+EXPORT_DIR = DATA_DIR / "history"
+WATERMARK_FILE_NAME = "_watermarks.json"
+
+
+# =========================
+# SCHEMA
+# =========================
+SCHEMA = pa.schema([
+    ("student_id", pa.string()),
+    ("topic", pa.string()),
+    ("score", pa.float64()),
+    ("level", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+])
+
+
+# =========================
+# FLATTENING
+# =========================
+def flatten_profile(profile: Dict, since: Optional[str] = None) -> Dict[str, list]:
+    """
+    Flatten one profile's history into column lists.
+
+    Args:
+        profile (dict): output of profiler.load_profile()
+        since (str): ISO timestamp; only newer entries are included
+
+    Returns:
+        dict: column name -> list of values
+    """
+    columns = {name: [] for name in SCHEMA.names}
+    student_id = profile["student_id"]
+    since_dt = datetime.fromisoformat(since) if since else None
+
+    for topic, data in profile["topics"].items():
+        for entry in data["history"]:
+            timestamp = datetime.fromisoformat(entry["timestamp"])
+            if since_dt is not None and timestamp <= since_dt:
+                continue
+            columns["student_id"].append(student_id)
+            columns["topic"].append(topic)
+            columns["score"].append(float(entry["score"]))
+            columns["level"].append(entry["level"])
+            columns["timestamp"].append(timestamp)
+
+    return columns
+
+
+# =========================
+# INCREMENTAL EXPORT
+# =========================
+def _load_watermarks(export_dir: Path) -> Dict[str, str]:
+    try:
+        with open(export_dir / WATERMARK_FILE_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_watermarks(export_dir: Path, watermarks: Dict[str, str]) -> None:
+    path = export_dir / WATERMARK_FILE_NAME
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=4)
+    os.replace(tmp_file, path)
+
+
+def export_profiles(
+    profiles: Iterable[Dict],
+    export_dir: Path = EXPORT_DIR
+) -> int:
+    """
+    Append history entries not yet exported to the Parquet dataset.
+
+    Each student's latest exported timestamp is kept in a watermark file,
+    so repeated exports only write new attempts.
+
+    Returns:
+        int: number of rows written
+    """
+    export_dir.mkdir(parents=True, exist_ok=True)
+    watermarks = _load_watermarks(export_dir)
+
+    columns = {name: [] for name in SCHEMA.names}
+    for profile in profiles:
+        student_id = profile["student_id"]
+        rows = flatten_profile(profile, since=watermarks.get(student_id))
+
+        if not rows["timestamp"]:
+            continue
+
+        for name in SCHEMA.names:
+            columns[name].extend(rows[name])
+        watermarks[student_id] = max(rows["timestamp"]).isoformat()
+
+    table = pa.Table.from_pydict(columns, schema=SCHEMA)
+    if table.num_rows == 0:
+        return 0
+
+    part = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    pq.write_table(table, export_dir / f"part-{part}.parquet")
+    _save_watermarks(export_dir, watermarks)
+    return table.num_rows
+
+
+def main():
+    written = export_profiles([load_profile()])
+    print(f"Exported {written} new history rows to {EXPORT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
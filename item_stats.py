@@ -0,0 +1,338 @@
+"""
+item_stats.py
+-------------
+Item analytics for the question bank.
+
+Responsibilities:
+- Update per-question streaming counters on every quiz submission
+- Derive p-value, point-biserial discrimination, distractor frequencies
+  and mean time-to-answer from the counters without rescanning history
+- Provide empirically calibrated difficulty labels for quiz sampling
+- Persist counters to data/item_stats.db (SQLite, shared by all processes)
+"""
+
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+# =========================
+# FILE PATHS
+# =========================
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+STATS_FILE = DATA_DIR / "item_stats.db"
+
+
+# =========================
+# CONFIG
+# =========================
+OPTION_COLUMNS = ("option1", "option2", "option3", "option4")
+
+# Responses needed before the empirical difficulty replaces the CSV label
+MIN_RESPONSES = 20
+
+# p-value cut-offs for calibrated difficulty
+EASY_P_VALUE = 0.75
+HARD_P_VALUE = 0.40
+
+# Seconds a writer waits for another process's transaction to finish
+DB_TIMEOUT = 30
+
+
+# Calibrated labels, cached until another submission changes one of them
+_labels_cache: Optional[tuple] = None
+# Database files whose tables this process has already created
+_initialized: set = set()
+_lock = threading.Lock()
+
+
+# =========================
+# STORAGE
+# =========================
+# Counters live in SQLite so every process (Streamlit, several uvicorn
+# workers) applies its increments inside one transaction on the shared
+# file; nothing is cached in memory that another process could overwrite.
+COUNTER_COLUMNS = (
+    "n",
+    "n_correct",
+    # Rest score = share of the *other* questions in the same submission
+    # answered correctly. Kept as running sums so the point-biserial
+    # correlation can be derived at any time.
+    "sum_rest",
+    "sum_rest_sq",
+    "sum_rest_correct",
+    "option1_count",
+    "option2_count",
+    "option3_count",
+    "option4_count",
+    "n_timed",
+    "sum_time",
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS item_counters (
+    question_id INTEGER PRIMARY KEY,
+    {", ".join(
+        f"{column} {'REAL' if column.startswith('sum_') else 'INTEGER'} "
+        "NOT NULL DEFAULT 0"
+        for column in COUNTER_COLUMNS
+    )}
+);
+CREATE TABLE IF NOT EXISTS stats_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    labels_version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats_meta (id, labels_version) VALUES (0, 0);
+"""
+
+_UPSERT = f"""
+INSERT INTO item_counters (question_id, {", ".join(COUNTER_COLUMNS)})
+VALUES (?, {", ".join("?" for _ in COUNTER_COLUMNS)})
+ON CONFLICT (question_id) DO UPDATE SET
+{", ".join(f"{c} = {c} + excluded.{c}" for c in COUNTER_COLUMNS)}
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    DATA_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(STATS_FILE, timeout=DB_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    with _lock:
+        if STATS_FILE not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _initialized.add(STATS_FILE)
+    return conn
+
+
+def _empty_counters() -> Dict:
+    return dict.fromkeys(COUNTER_COLUMNS, 0)
+
+
+def _label(n: float, n_correct: float) -> Optional[str]:
+    if n < MIN_RESPONSES:
+        return None
+
+    p_value = n_correct / n
+    if p_value >= EASY_P_VALUE:
+        return "Easy"
+    elif p_value < HARD_P_VALUE:
+        return "Hard"
+    else:
+        return "Medium"
+
+
+# =========================
+# RECORDING
+# =========================
+def record_submission(
+    graded: List[Dict],
+    answer_times: Optional[Dict[int, float]] = None
+) -> None:
+    """
+    Fold one quiz submission into the item counters.
+
+    Safe to call from several processes at once: each submission is applied
+    as increments inside a single SQLite write transaction.
+
+    Args:
+        graded (list): output of quiz.grade_questions()
+        answer_times (dict): question id -> seconds taken to answer
+    """
+    if not graded:
+        return
+
+    answer_times = answer_times or {}
+    total_correct = sum(item["correct"] for item in graded)
+    others = max(len(graded) - 1, 1)
+
+    deltas = {}
+    for item in graded:
+        d = deltas.setdefault(item["id"], _empty_counters())
+        rest = (total_correct - item["correct"]) / others
+
+        d["n"] += 1
+        d["sum_rest"] += rest
+        d["sum_rest_sq"] += rest * rest
+
+        if item["correct"]:
+            d["n_correct"] += 1
+            d["sum_rest_correct"] += rest
+
+        if item["option_index"] is not None:
+            d[f"{OPTION_COLUMNS[item['option_index']]}_count"] += 1
+
+        seconds = answer_times.get(item["id"])
+        if seconds is not None:
+            d["n_timed"] += 1
+            d["sum_time"] += seconds
+
+    placeholders = ", ".join("?" for _ in deltas)
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        before = {
+            row["question_id"]: _label(row["n"], row["n_correct"])
+            for row in conn.execute(
+                "SELECT question_id, n, n_correct FROM item_counters "
+                f"WHERE question_id IN ({placeholders})",
+                list(deltas)
+            )
+        }
+
+        conn.executemany(_UPSERT, [
+            (q_id, *(d[column] for column in COUNTER_COLUMNS))
+            for q_id, d in deltas.items()
+        ])
+
+        after = {
+            row["question_id"]: _label(row["n"], row["n_correct"])
+            for row in conn.execute(
+                "SELECT question_id, n, n_correct FROM item_counters "
+                f"WHERE question_id IN ({placeholders})",
+                list(deltas)
+            )
+        }
+        if any(before.get(q_id) != label for q_id, label in after.items()):
+            conn.execute(
+                "UPDATE stats_meta SET labels_version = labels_version + 1"
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+# =========================
+# DERIVED STATISTICS
+# =========================
+def _derive(c: Dict) -> Dict:
+    n = c["n"]
+    n_correct = c["n_correct"]
+    n_wrong = n - n_correct
+
+    p_value = n_correct / n if n else None
+
+    discrimination = None
+    if n_correct and n_wrong:
+        mean = c["sum_rest"] / n
+        variance = c["sum_rest_sq"] / n - mean * mean
+        if variance > 1e-12:
+            mean_correct = c["sum_rest_correct"] / n_correct
+            mean_wrong = (c["sum_rest"] - c["sum_rest_correct"]) / n_wrong
+            discrimination = (
+                (mean_correct - mean_wrong) / math.sqrt(variance)
+                * math.sqrt(p_value * (1 - p_value))
+            )
+
+    return {
+        "responses": n,
+        "p_value": p_value,
+        "point_biserial": discrimination,
+        "option_frequencies": {
+            column: (c[f"{column}_count"] / n if n else None)
+            for column in OPTION_COLUMNS
+        },
+        "mean_time_seconds": (
+            c["sum_time"] / c["n_timed"] if c["n_timed"] else None
+        )
+    }
+
+
+def get_item_stats(question_id: int) -> Dict:
+    """
+    Statistics for one question, derived from its counters in O(1).
+
+    Returns:
+        dict:
+            {
+                "responses": 42,
+                "p_value": 0.64,
+                "point_biserial": 0.31,
+                "option_frequencies": {"option1": 0.64, ...},
+                "mean_time_seconds": 12.5
+            }
+    """
+    return get_all_item_stats([question_id])[question_id]
+
+
+def get_all_item_stats(question_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+    """
+    Statistics for many questions (all recorded ones by default).
+    """
+    conn = _connect()
+    try:
+        counters = {
+            row["question_id"]: dict(row)
+            for row in conn.execute("SELECT * FROM item_counters")
+        }
+    finally:
+        conn.close()
+
+    if question_ids is None:
+        question_ids = list(counters)
+    return {
+        q_id: _derive(counters.get(q_id, _empty_counters()))
+        for q_id in question_ids
+    }
+
+
+def calibrated_labels() -> Dict[int, str]:
+    """
+    Difficulty labels from observed p-values, for every question with at
+    least MIN_RESPONSES responses.
+
+    The map is rebuilt only after a submission changes one of the labels,
+    so callers can use it on every quiz sample.
+    """
+    global _labels_cache
+
+    conn = _connect()
+    try:
+        version = conn.execute(
+            "SELECT labels_version FROM stats_meta"
+        ).fetchone()[0]
+
+        with _lock:
+            if _labels_cache is not None and _labels_cache[0] == version:
+                return _labels_cache[1]
+
+        labels = {
+            row["question_id"]: _label(row["n"], row["n_correct"])
+            for row in conn.execute(
+                "SELECT question_id, n, n_correct FROM item_counters "
+                "WHERE n >= ?",
+                (MIN_RESPONSES,)
+            )
+        }
+    finally:
+        conn.close()
+
+    with _lock:
+        _labels_cache = (version, labels)
+    return labels
+
+
+def labels_version() -> int:
+    """
+    Counter bumped whenever a submission changes a calibrated label.
+    """
+    conn = _connect()
+    try:
+        return conn.execute("SELECT labels_version FROM stats_meta").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def calibrated_difficulty(question_id: int, default: str) -> str:
+    """
+    Difficulty label from observed p-value, or `default` while the
+    question has fewer than MIN_RESPONSES responses.
+    """
+    return calibrated_labels().get(question_id, default)
@@ -0,0 +1,193 @@
+"""
+llm_router.py
+-------------
+Spreads LLM requests over a pool of local ollama servers.
+
+Responsibilities:
+- Hold one pooled ollama client per backend (separate ports/processes)
+- Pick a backend by least outstanding requests, preferring the backend a
+  prompt's affinity key hashes to so its KV/prompt cache stays warm
+- Periodically health-check backends and route around dead ones
+- Track per-backend queue depth, request, error and token counters
+
+Configure the pool with a comma-separated OLLAMA_HOSTS, e.g.
+    OLLAMA_HOSTS=http://127.0.0.1:11434,http://127.0.0.1:11435
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+import ollama
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_HOSTS = os.environ.get("OLLAMA_HOSTS", "http://127.0.0.1:11434")
+
+# Seconds between background health checks, and how long one may take
+HEALTH_CHECK_INTERVAL = 10
+HEALTH_CHECK_TIMEOUT = 5
+
+# How many more in-flight requests than the least loaded backend the
+# affinity backend may have before a request is sent elsewhere
+AFFINITY_SLACK = 1
+
+
+# =========================
+# BACKEND
+# =========================
+class Backend:
+    """
+    One ollama server and its load counters.
+    """
+
+    def __init__(self, host: str, timeout: Optional[float] = None, client=None):
+        self.host = host
+        self.client = client or ollama.Client(host=host, timeout=timeout)
+        # Generation clients wait out long queues; health checks should not
+        self.health_client = client or ollama.Client(
+            host=host, timeout=HEALTH_CHECK_TIMEOUT
+        )
+        self.healthy = True
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.tokens = 0
+
+    def snapshot(self) -> Dict:
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "max_outstanding": self.max_outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "tokens": self.tokens,
+        }
+
+
+def _affinity_score(key: str, host: str) -> int:
+    digest = hashlib.blake2b(f"{key}|{host}".encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+# =========================
+# ROUTER
+# =========================
+class LLMRouter:
+    """
+    Least-outstanding-requests balancer with affinity hashing.
+
+    The affinity backend for a key is chosen by rendezvous hashing, so
+    adding or losing a backend only remaps the keys that lived on it.
+    """
+
+    def __init__(self, backends: List[Backend]):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_hosts(cls, hosts: str = DEFAULT_HOSTS, timeout: Optional[float] = None):
+        """
+        Build a router from a comma-separated host list.
+        """
+        return cls([
+            Backend(host.strip(), timeout)
+            for host in hosts.split(",")
+            if host.strip()
+        ])
+
+    def _pick(self, affinity_key: Optional[str]) -> Backend:
+        # With every backend marked down, still try them rather than fail
+        candidates = [b for b in self.backends if b.healthy] or self.backends
+        least = min(candidates, key=lambda b: (b.outstanding, b.requests))
+
+        if affinity_key is not None:
+            preferred = max(
+                candidates, key=lambda b: _affinity_score(affinity_key, b.host)
+            )
+            if preferred.outstanding <= least.outstanding + AFFINITY_SLACK:
+                return preferred
+
+        return least
+
+    @contextmanager
+    def acquire(self, affinity_key: Optional[str] = None) -> Iterator[Backend]:
+        """
+        Reserve a backend for the duration of one request.
+
+        A refused connection marks the backend unhealthy until the next
+        successful health check. Other transport errors, such as a timeout
+        on a busy backend, only count as errors.
+        """
+        with self._lock:
+            backend = self._pick(affinity_key)
+            backend.outstanding += 1
+            backend.requests += 1
+            backend.max_outstanding = max(backend.max_outstanding, backend.outstanding)
+
+        try:
+            yield backend
+        except httpx.ConnectError:
+            with self._lock:
+                backend.errors += 1
+                backend.healthy = False
+            raise
+        except (httpx.TransportError, ollama.ResponseError):
+            with self._lock:
+                backend.errors += 1
+            raise
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def record_tokens(self, backend: Backend, tokens: int) -> None:
+        with self._lock:
+            backend.tokens += tokens
+
+    # =========================
+    # HEALTH CHECKS
+    # =========================
+    def check_health(self) -> None:
+        for backend in self.backends:
+            try:
+                backend.health_client.list()
+                healthy = True
+            except Exception:
+                healthy = False
+            with self._lock:
+                backend.healthy = healthy
+
+    def start_health_checks(self, interval: float = HEALTH_CHECK_INTERVAL) -> None:
+        """
+        Run check_health() every `interval` seconds on a daemon thread.
+        """
+        if self._health_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.check_health()
+
+        self._health_thread = threading.Thread(
+            target=loop, name="llm-router-health", daemon=True
+        )
+        self._health_thread.start()
+
+    # =========================
+    # METRICS
+    # =========================
+    def metrics(self) -> List[Dict]:
+        with self._lock:
+            return [backend.snapshot() for backend in self.backends]
@@ -11,9 +11,17 @@ Responsibilities:
 """
 
 import json
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker
+    fcntl = None
 
 
 # =========================
@@ -23,6 +31,39 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 PROFILE_FILE = DATA_DIR / "student_profile.json"
 
+# Serializes read-modify-write cycles on the profile file between threads
+# of the same process (Streamlit sessions, API workers' threadpool).
+# profile_lock() adds an flock on a sidecar file for other processes.
+_profile_lock = threading.RLock()
+_lock_depth = 0
+
+
+@contextmanager
+def profile_lock() -> Iterator[None]:
+    """
+    Hold the profile exclusively, across threads and (on POSIX) processes
+    such as several uvicorn workers. Re-entrant within a thread.
+    """
+    global _lock_depth
+
+    with _profile_lock:
+        lock_file = None
+        if _lock_depth == 0 and fcntl is not None:
+            DATA_DIR.mkdir(exist_ok=True)
+            lock_file = open(
+                PROFILE_FILE.with_name(f"{PROFILE_FILE.name}.lock"), "a"
+            )
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if lock_file is not None:
+                # Closing the file releases the flock
+                lock_file.close()
+
 
 # =========================
 # CORE FUNCTIONS
@@ -52,8 +93,14 @@ def save_profile(profile: Dict) -> None:
     """
     DATA_DIR.mkdir(exist_ok=True)
 
-    with open(PROFILE_FILE, "w", encoding="utf-8") as f:
-        json.dump(profile, f, indent=4)
+    # Write to a temp file and swap it in, so concurrent readers never see
+    # a half-written profile (which load_profile would treat as corrupted).
+    tmp_file = PROFILE_FILE.with_name(f"{PROFILE_FILE.name}.{os.getpid()}.tmp")
+
+    with profile_lock():
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=4)
+        os.replace(tmp_file, PROFILE_FILE)
 
 
 def update_profile(
@@ -70,32 +117,33 @@ def update_profile(
     Returns:
         dict: updated profile
     """
-    profile = load_profile()
+    with profile_lock():
+        profile = load_profile()
 
-    timestamp = datetime.utcnow().isoformat()
+        timestamp = datetime.utcnow().isoformat()
 
-    profile["last_updated"] = timestamp
-    profile["quiz_attempts"] += 1
+        profile["last_updated"] = timestamp
+        profile["quiz_attempts"] += 1
 
-    # Update per-topic history
-    for topic, score in scores.items():
-        if topic not in profile["topics"]:
-            profile["topics"][topic] = {
-                "history": [],
-                "current_score": None,
-                "current_level": None
-            }
+        # Update per-topic history
+        for topic, score in scores.items():
+            if topic not in profile["topics"]:
+                profile["topics"][topic] = {
+                    "history": [],
+                    "current_score": None,
+                    "current_level": None
+                }
 
-        profile["topics"][topic]["history"].append({
-            "score": round(score, 2),
-            "level": skill_profile[topic]["level"],
-            "timestamp": timestamp
-        })
+            profile["topics"][topic]["history"].append({
+                "score": round(score, 2),
+                "level": skill_profile[topic]["level"],
+                "timestamp": timestamp
+            })
 
-        profile["topics"][topic]["current_score"] = round(score, 2)
-        profile["topics"][topic]["current_level"] = skill_profile[topic]["level"]
+            profile["topics"][topic]["current_score"] = round(score, 2)
+            profile["topics"][topic]["current_level"] = skill_profile[topic]["level"]
 
-    save_profile(profile)
+        save_profile(profile)
     return profile
 
 
@@ -0,0 +1,298 @@
+"""
+question_gen.py
+---------------
+Offline pipeline that grows the question bank with LLM-written MCQs.
+
+Responsibilities:
+- Request batches of questions per (topic, difficulty, bloom) cell,
+  several batches in flight at once
+- Validate each generated question against the bank schema
+- Reject near-duplicates of existing or newly accepted questions
+  (MinHash LSH, see dedup.py)
+- Append accepted questions to data/questions.csv in one write
+
+Usage:
+    python question_gen.py --batches 2 --batch-size 5 --workers 4
+"""
+
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from dedup import MinHashLSH
+from item_stats import OPTION_COLUMNS
+from quiz import QUESTIONS_FILE, get_question_bank, reload_question_bank
+from recommender import DEFAULT_TOPIC_SEQUENCE
+from tutor import DEADLINES, NUM_PREDICT, build_question_gen_prompt, call_llm
+
+
+# =========================
+# CONFIG
+# =========================
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+BLOOM_LEVELS = ("Remember", "Understand", "Apply", "Analyze")
+DIFFICULTY_WEIGHTS = {"Easy": 1, "Medium": 2, "Hard": 3}
+
+QUESTION_FIELDS = ("question",) + OPTION_COLUMNS + ("answer",)
+
+# The question_gen token budget and deadline in tutor.py are sized for this
+# many questions; other batch sizes scale both proportionally.
+DEFAULT_BATCH_SIZE = 5
+
+
+# =========================
+# GENERATION
+# =========================
+def _batch_schema(count: int) -> Dict:
+    return {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "maxItems": count,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        field: {"type": "string", "maxLength": 200}
+                        for field in QUESTION_FIELDS
+                    },
+                    "required": list(QUESTION_FIELDS)
+                }
+            }
+        },
+        "required": ["questions"]
+    }
+
+
+def _salvage_questions(raw: str) -> List[Dict]:
+    """
+    Recover the questions of a truncated batch that were fully written.
+
+    Decodes the "questions" array element by element and stops at the
+    first one that was cut off.
+    """
+    match = re.search(r'"questions"\s*:\s*\[', raw)
+    if match is None:
+        return []
+
+    decoder = json.JSONDecoder()
+    separator = re.compile(r"\s*,?\s*")
+    questions = []
+    pos = match.end()
+    while True:
+        pos = separator.match(raw, pos).end()
+        try:
+            question, pos = decoder.raw_decode(raw, pos)
+        except json.JSONDecodeError:
+            break
+        questions.append(question)
+    return questions
+
+
+def generate_batch(
+    topic: str, difficulty: str, bloom: str, count: int
+) -> Tuple[List[Dict], bool]:
+    """
+    Ask the model for `count` questions in one cell.
+
+    The token budget and deadline grow with `count`. If the output is still
+    cut off, the questions written in full are kept.
+
+    Returns:
+        tuple: (raw, unvalidated candidates, whether the output was truncated)
+    """
+    scale = max(count / DEFAULT_BATCH_SIZE, 1)
+    raw = call_llm(
+        build_question_gen_prompt(topic, difficulty, bloom, count),
+        kind="question_gen",
+        format=_batch_schema(count),
+        affinity=f"question_gen:{topic}",
+        num_predict=round(NUM_PREDICT["question_gen"] * scale),
+        deadline=DEADLINES["question_gen"] * scale
+    )
+    try:
+        return json.loads(raw).get("questions", []), False
+    except json.JSONDecodeError:
+        return _salvage_questions(raw), True
+
+
+def validate_question(
+    candidate: Dict, topic: str, difficulty: str, bloom: str
+) -> Optional[Dict]:
+    """
+    Normalize a candidate into a bank row, or return None if it is invalid.
+
+    A valid question has non-empty text, four distinct non-empty options,
+    and an answer that is exactly one of the options.
+    """
+    if not isinstance(candidate, dict):
+        return None
+
+    row = {field: str(candidate.get(field, "")).strip() for field in QUESTION_FIELDS}
+    options = [row[column] for column in OPTION_COLUMNS]
+
+    if not row["question"] or not all(options):
+        return None
+    if len(set(options)) != len(options):
+        return None
+    if row["answer"] not in options:
+        return None
+
+    row.update({
+        "topic": topic,
+        "difficulty": difficulty,
+        "weight": DIFFICULTY_WEIGHTS[difficulty],
+        "bloom": bloom
+    })
+    return row
+
+
+def build_index(bank: pd.DataFrame) -> MinHashLSH:
+    """
+    Index every existing question so generated ones can be checked against it.
+    """
+    index = MinHashLSH()
+    for q_id, text in zip(bank["id"], bank["question"]):
+        index.add_if_new(int(q_id), text)
+    return index
+
+
+def generate_questions(
+    cells: Iterable[Tuple[str, str, str]],
+    batches_per_cell: int,
+    batch_size: int,
+    workers: int,
+    index: MinHashLSH
+) -> Tuple[List[Dict], Dict[str, float]]:
+    """
+    Run generation batches concurrently and keep valid, novel questions.
+
+    Validation and deduplication happen on the calling thread as batches
+    complete, so the index is never touched concurrently.
+
+    Returns:
+        tuple: (accepted rows, report counters)
+    """
+    jobs = [cell for cell in cells for _ in range(batches_per_cell)]
+    accepted: List[Dict] = []
+    report = {
+        "batches": len(jobs),
+        "failed_batches": 0,
+        "truncated_batches": 0,
+        "generated": 0,
+        "invalid": 0,
+        "duplicates": 0,
+        "accepted": 0,
+        "dedup_seconds": 0.0
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(generate_batch, topic, difficulty, bloom, batch_size):
+                (topic, difficulty, bloom)
+            for topic, difficulty, bloom in jobs
+        }
+
+        for future in as_completed(futures):
+            topic, difficulty, bloom = futures[future]
+            try:
+                candidates, truncated = future.result()
+            except Exception:
+                # A bad batch (timeout, backend error) should not stop the run
+                report["failed_batches"] += 1
+                continue
+            report["truncated_batches"] += truncated
+
+            for candidate in candidates:
+                report["generated"] += 1
+                row = validate_question(candidate, topic, difficulty, bloom)
+                if row is None:
+                    report["invalid"] += 1
+                    continue
+
+                start = time.perf_counter()
+                is_new = index.add_if_new(f"new-{len(accepted)}", row["question"])
+                report["dedup_seconds"] += time.perf_counter() - start
+
+                if not is_new:
+                    report["duplicates"] += 1
+                    continue
+
+                accepted.append(row)
+                report["accepted"] += 1
+
+    return accepted, report
+
+
+# =========================
+# BANK APPEND
+# =========================
+def append_questions(rows: List[Dict]) -> int:
+    """
+    Assign ids and append rows to the question bank CSV in one write.
+
+    Returns:
+        int: number of rows written
+    """
+    if not rows:
+        return 0
+
+    bank = get_question_bank()
+    next_id = int(bank["id"].max()) + 1
+
+    new_rows = pd.DataFrame(rows)
+    new_rows.insert(0, "id", range(next_id, next_id + len(new_rows)))
+    new_rows = new_rows[list(bank.columns)]
+
+    new_rows.to_csv(QUESTIONS_FILE, mode="a", header=False, index=False)
+    reload_question_bank()
+    return len(new_rows)
+
+
+# =========================
+# CLI
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Generate quiz questions with the local LLM.")
+    parser.add_argument("--topics", nargs="+", default=list(DEFAULT_TOPIC_SEQUENCE))
+    parser.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES))
+    parser.add_argument("--blooms", nargs="+", default=list(BLOOM_LEVELS))
+    parser.add_argument("--batches", type=int, default=1, help="batches per cell")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true", help="do not write to the bank")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index(get_question_bank())
+    index_seconds = time.perf_counter() - start
+
+    accepted, report = generate_questions(
+        product(args.topics, args.difficulties, args.blooms),
+        args.batches,
+        args.batch_size,
+        args.workers,
+        index
+    )
+    elapsed = time.perf_counter() - start
+
+    written = 0 if args.dry_run else append_questions(accepted)
+
+    lookups = report["generated"] - report["invalid"]
+    print(f"Indexed {len(index) - report['accepted']} existing questions in {index_seconds:.2f}s")
+    for key, value in report.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+    print(f"written: {written}")
+    print(f"throughput: {report['accepted'] / elapsed * 60:.1f} accepted questions/minute")
+    if lookups:
+        print(f"dedup cost: {report['dedup_seconds'] / lookups * 1e6:.0f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,16 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import random
+import time
+from array import array
+from functools import lru_cache
+
+from item_stats import (
+    OPTION_COLUMNS,
+    calibrated_labels,
+    labels_version,
+    record_submission
+)
 
 
 # =========================
@@ -24,8 +34,61 @@ QUESTIONS_FILE = DATA_DIR / "questions.csv"
 # =========================
 # LOAD QUESTIONS
 # =========================
+@lru_cache(maxsize=1)
+def get_question_bank() -> pd.DataFrame:
+    """
+    Read the question bank once per process.
+
+    The returned DataFrame is shared by every session and must not be
+    modified; call reload_question_bank() after changing the CSV.
+    """
+    return pd.read_csv(QUESTIONS_FILE)
+
+
+@lru_cache(maxsize=1)
+def _questions_by_id() -> pd.DataFrame:
+    return get_question_bank().set_index("id", drop=False)
+
+
+@lru_cache(maxsize=1)
+def _calibrated_bank(version: int) -> pd.DataFrame:
+    # Built once per labels version, i.e. only after a submission moves a
+    # question into a different difficulty tier.
+    df = get_question_bank()
+    calibrated = df["id"].map(calibrated_labels())
+    return df.assign(
+        difficulty=calibrated.fillna(df["difficulty"])
+    ).set_index("id", drop=False)
+
+
+def get_calibrated_bank() -> pd.DataFrame:
+    """
+    Question bank indexed by id, with the CSV difficulty replaced by the
+    observed difficulty once enough responses exist. Shared and read-only,
+    like get_question_bank().
+    """
+    return _calibrated_bank(labels_version())
+
+
+def reload_question_bank() -> None:
+    """
+    Drop the cached question bank so the next access re-reads the CSV.
+    """
+    get_question_bank.cache_clear()
+    _questions_by_id.cache_clear()
+    _calibrated_bank.cache_clear()
+
+
+def get_questions(ids) -> pd.DataFrame:
+    """
+    Look up questions by id in the shared bank, preserving order.
+    """
+    return _questions_by_id().loc[list(ids)]
+
+
 def load_questions():
-    df = pd.read_csv(QUESTIONS_FILE)
+    # Tier by observed difficulty once enough responses exist
+    df = get_calibrated_bank()
 
     easy = df[df["difficulty"]=="Easy"]
     medium = df[df["difficulty"]=="Medium"]
@@ -48,6 +111,16 @@ def load_questions():
     return df_final.sample(frac=1).reset_index(drop=True)
 
 
+def sample_question_ids() -> array:
+    """
+    Sample a quiz and return only its question ids.
+
+    Sessions keep this compact array instead of a DataFrame; question
+    content is looked up in the shared bank with get_questions().
+    """
+    return array("i", load_questions()["id"].tolist())
+
+
 
 
 # =========================
@@ -60,6 +133,9 @@ def init_quiz_state():
     if "quiz_submitted" not in st.session_state:
         st.session_state.quiz_submitted = False
 
+    if "quiz_answer_times" not in st.session_state:
+        st.session_state.quiz_answer_times = {}
+
 def filter_questions(df, level):
     if level == "Weak":
         return df[df["difficulty"].isin(["Easy", "Medium"])]
@@ -68,27 +144,49 @@ def filter_questions(df, level):
     else:
         return df
 
+
+def filter_question_ids(ids, level) -> array:
+    """
+    Keep the ids whose calibrated difficulty suits `level`, so filtering
+    agrees with the tiers load_questions() sampled from.
+    """
+    df = get_calibrated_bank().loc[list(ids)]
+    return array("i", filter_questions(df, level)["id"].tolist())
+
 # =========================
 # RENDER QUIZ
 # =========================
+def _record_answer_time(q_id):
+    """
+    Radio on_change callback: time since the previous answer (or since the
+    quiz was shown) is taken as the time spent on this question.
+    """
+    now = time.monotonic()
+    if q_id not in st.session_state.quiz_answer_times:
+        st.session_state.quiz_answer_times[q_id] = (
+            now - st.session_state.quiz_last_answer_at
+        )
+    st.session_state.quiz_last_answer_at = now
+
+
 def render_quiz(df):
     st.header("📋 Diagnostic Quiz")
 
     for _, row in df.iterrows():
         q_id = int(row["id"])
-        options = [
-            row["option1"],
-            row["option2"],
-            row["option3"],
-            row["option4"]
-        ]
+        options = [row[column] for column in OPTION_COLUMNS]
 
         st.subheader(row["question"])
 
+        # No preselected option, so untouched questions do not count as
+        # picks of option1 in the item statistics.
         selected = st.radio(
             "Choose one option:",
             options,
-            key=f"question_{q_id}"
+            index=None,
+            key=f"question_{q_id}",
+            on_change=_record_answer_time,
+            args=(q_id,)
         )
 
         st.session_state.quiz_answers[q_id] = selected
@@ -102,19 +200,66 @@ def render_quiz(df):
 # =========================
 # EVALUATE QUIZ
 # =========================
-def evaluate_quiz(df):
-    topic_stats = {}
+def grade_questions(df, answers) -> list:
+    """
+    Per-question grading of a submission.
+
+    Args:
+        df (DataFrame): questions that were asked
+        answers (dict): question id -> selected option text
+
+    Returns:
+        list of dict:
+            [
+                {"id": 3, "topic": "Basics", "correct": True, "option_index": 1}
+            ]
+    """
+    graded = []
 
     for _, row in df.iterrows():
         q_id = int(row["id"])
-        topic = row["topic"]
-        correct_answer = row["answer"]
-        user_answer = st.session_state.quiz_answers.get(q_id)
+        user_answer = answers.get(q_id)
+
+        option_index = None
+        for i, column in enumerate(OPTION_COLUMNS):
+            if user_answer is not None and row[column] == user_answer:
+                option_index = i
+                break
+
+        graded.append({
+            "id": q_id,
+            "topic": row["topic"],
+            "correct": user_answer == row["answer"],
+            "option_index": option_index
+        })
+
+    return graded
+
+
+def evaluate_quiz(df, answers=None):
+    """
+    Compute topic-wise percentage scores.
+
+    Args:
+        df (DataFrame): questions that were asked
+        answers (dict): question id -> selected option text.
+            Defaults to the answers in the Streamlit session.
+
+    Returns:
+        dict: topic -> score (0–100)
+    """
+    if answers is None:
+        answers = st.session_state.quiz_answers
+
+    topic_stats = {}
+
+    for item in grade_questions(df, answers):
+        topic = item["topic"]
 
         if topic not in topic_stats:
             topic_stats[topic] = {"correct": 0, "total": 0}
 
-        if user_answer == correct_answer:
+        if item["correct"]:
             topic_stats[topic]["correct"] += 1
 
         topic_stats[topic]["total"] += 1
@@ -132,22 +277,35 @@ def evaluate_quiz(df):
 def run_quiz():
     init_quiz_state()
 
-    # Generate questions only once
-    if "quiz_df" not in st.session_state:
-        st.session_state.quiz_df = load_questions()
+    # Generate questions only once. Filtering happens here too, so the
+    # graded set is the same one that was shown even after the profile's
+    # attempt count changes on submission.
+    if "quiz_ids" not in st.session_state:
+        ids = sample_question_ids()
 
-    df = st.session_state.quiz_df
+        from profiler import load_profile
+        profile = load_profile()
 
-    from profiler import load_profile
-    profile = load_profile()
+        if profile["quiz_attempts"] > 0:
+            avg_level = "Medium"
+            ids = filter_question_ids(ids, avg_level)
 
-    if profile["quiz_attempts"] > 0:
-        avg_level = "Medium"
-        df = filter_questions(df, avg_level)
+        st.session_state.quiz_ids = ids
+        st.session_state.quiz_last_answer_at = time.monotonic()
+
+    df = get_questions(st.session_state.quiz_ids)
 
     if not st.session_state.quiz_submitted:
         render_quiz(df)
         return False, None
     else:
+        # Feed item analytics exactly once per submission, not per rerun
+        if not st.session_state.get("quiz_recorded"):
+            graded = grade_questions(df, st.session_state.quiz_answers)
+            record_submission(graded, st.session_state.quiz_answer_times)
+            # Handed to the review scheduler, which pops it on the same run
+            st.session_state.quiz_graded = graded
+            st.session_state.quiz_recorded = True
+
         scores = evaluate_quiz(df)
         return True, scores
@@ -12,24 +12,114 @@ Output:
 - Topic-wise recommendations with reasons
 """
 
-from typing import Dict, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
 
 
 # =========================
 # CONFIG: DEFAULT TOPIC FLOW
 # =========================
-# This represents prerequisite order
-DEFAULT_TOPIC_SEQUENCE = [
+# This represents prerequisite order. Cached learning paths are keyed on
+# the sequence too, so rebinding it never serves paths in the old order.
+DEFAULT_TOPIC_SEQUENCE = (
     "Basics",
     "Loops",
-    "Functions"
-]
+    "Functions",
+)
+
+
+# =========================
+# TEMPLATE TABLE
+# =========================
+# Every recommendation depends only on a topic's level (and, for the
+# explanation, its trend), so the output pieces are defined once per level
+# and assembled from cached, immutable per-topic templates.
+LEVELS = ("Weak", "Medium", "Strong")
+TRENDS = ("Improving", "Declining", "Stagnant", "Not enough data", None)
+
+PATH_STEPS = {
+    "Weak": (
+        ("Revise fundamentals", "Low quiz performance"),
+        ("Practice basic problems", "Strengthen core understanding"),
+        ("Re-attempt assessment", "Validate improvement"),
+    ),
+    "Medium": (
+        ("Practice intermediate problems", "Partial understanding detected"),
+    ),
+    "Strong": (
+        ("Proceed to next topic", "Strong understanding confirmed"),
+    ),
+}
+
+RESOURCES = {
+    "Weak": ("Beginner", "Concept clarity and examples"),
+    "Medium": ("Intermediate", "Practice and problem-solving"),
+    "Strong": ("Advanced", "Application and optimization"),
+}
+
+# Cache bounds: templates are per topic, signatures per distinct profile
+TEMPLATE_CACHE_SIZE = 65536
+SIGNATURE_CACHE_SIZE = 4096
+
+
+class TopicTemplate(NamedTuple):
+    path: Tuple[Mapping[str, str], ...]
+    resources: Mapping[str, str]
+    explanation: str
+
+
+def _level_key(level: str) -> str:
+    # Anything that is not Weak or Medium is treated as Strong
+    return level if level in ("Weak", "Medium") else "Strong"
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def topic_template(topic: str, level: str, trend: Optional[str] = None) -> TopicTemplate:
+    """
+    Immutable recommendation pieces for one (topic, level, trend).
+    """
+    key = _level_key(level)
+    recommended_level, focus = RESOURCES[key]
+
+    return TopicTemplate(
+        path=tuple(
+            MappingProxyType({"topic": topic, "action": action, "reason": reason})
+            for action, reason in PATH_STEPS[key]
+        ),
+        resources=MappingProxyType({
+            "recommended_level": recommended_level,
+            "focus": focus
+        }),
+        explanation=f"""
+This recommendation was generated because:
+- Topic: {topic}
+- Skill level: {level}
+- Learning trend: {trend}
+"""
+    )
+
+
+def level_signature(skill_profile: Dict[str, Dict]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Hashable (topic, level) summary of a skill profile, in profile order.
+    """
+    return tuple((topic, data["level"]) for topic, data in skill_profile.items())
+
+
+# Warm the table for the known topic sequence
+for _topic in DEFAULT_TOPIC_SEQUENCE:
+    for _level in LEVELS:
+        for _trend in TRENDS:
+            topic_template(_topic, _level, _trend)
 
 
 # =========================
 # CORE LOGIC
 # =========================
-def generate_learning_path(skill_profile: Dict[str, Dict]) -> List[Dict]:
+def generate_learning_path(
+    skill_profile: Dict[str, Dict]
+) -> Tuple[Mapping[str, str], ...]:
     """
     Generate an adaptive learning path based on skill gaps.
 
@@ -42,68 +132,42 @@ def generate_learning_path(skill_profile: Dict[str, Dict]) -> List[Dict]:
             }
 
     Returns:
-        list of dict:
-            [
+        tuple of read-only dicts, shared between callers:
+            (
                 {
                     "topic": "Loops",
                     "action": "Revise",
                     "reason": "Weak understanding detected"
-                }
-            ]
+                },
+            )
     """
-    learning_path = []
-
-    for topic in DEFAULT_TOPIC_SEQUENCE:
-        if topic not in skill_profile:
-            continue
+    return _learning_path(level_signature(skill_profile), DEFAULT_TOPIC_SEQUENCE)
 
-        level = skill_profile[topic]["level"]
 
-        if level == "Weak":
-            learning_path.extend([
-                {
-                    "topic": topic,
-                    "action": "Revise fundamentals",
-                    "reason": "Low quiz performance"
-                },
-                {
-                    "topic": topic,
-                    "action": "Practice basic problems",
-                    "reason": "Strengthen core understanding"
-                },
-                {
-                    "topic": topic,
-                    "action": "Re-attempt assessment",
-                    "reason": "Validate improvement"
-                }
-            ])
-
-        elif level == "Medium":
-            learning_path.append({
-                "topic": topic,
-                "action": "Practice intermediate problems",
-                "reason": "Partial understanding detected"
-            })
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _learning_path(signature, sequence) -> Tuple[Mapping[str, str], ...]:
+    levels = dict(signature)
+    learning_path = []
 
-        else:  # Strong
-            learning_path.append({
-                "topic": topic,
-                "action": "Proceed to next topic",
-                "reason": "Strong understanding confirmed"
-            })
+    for topic in sequence:
+        if topic not in levels:
+            continue
+        learning_path.extend(topic_template(topic, levels[topic]).path)
 
-    return learning_path
+    return tuple(learning_path)
 
 
 # =========================
 # TOPIC-SPECIFIC RECOMMENDATIONS
 # =========================
-def recommend_resources(skill_profile: Dict[str, Dict]) -> Dict[str, Dict]:
+def recommend_resources(
+    skill_profile: Dict[str, Dict]
+) -> Mapping[str, Mapping[str, str]]:
     """
     Generate resource recommendations per topic.
 
     Returns:
-        dict:
+        read-only dict, shared between callers:
             {
                 "Loops": {
                     "recommended_level": "Beginner",
@@ -111,42 +175,28 @@ def recommend_resources(skill_profile: Dict[str, Dict]) -> Dict[str, Dict]:
                 }
             }
     """
-    recommendations = {}
-
-    for topic, data in skill_profile.items():
-        level = data["level"]
+    return _resources(level_signature(skill_profile))
 
-        if level == "Weak":
-            recommendations[topic] = {
-                "recommended_level": "Beginner",
-                "focus": "Concept clarity and examples"
-            }
-        elif level == "Medium":
-            recommendations[topic] = {
-                "recommended_level": "Intermediate",
-                "focus": "Practice and problem-solving"
-            }
-        else:
-            recommendations[topic] = {
-                "recommended_level": "Advanced",
-                "focus": "Application and optimization"
-            }
 
-    return recommendations
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _resources(signature) -> Mapping[str, Mapping[str, str]]:
+    return MappingProxyType({
+        topic: topic_template(topic, level).resources
+        for topic, level in signature
+    })
 
 
 # =========================
 # SUMMARY (FOR DASHBOARD)
 # =========================
 def generate_recommendation_summary(skill_profile: dict) -> str:
-    weak = []
-    strong = []
+    return _summary(level_signature(skill_profile))
 
-    for topic, data in skill_profile.items():
-        if data["level"] == "Weak":
-            weak.append(topic)
-        elif data["level"] == "Strong":
-            strong.append(topic)
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _summary(signature) -> str:
+    weak = [topic for topic, level in signature if level == "Weak"]
+    strong = [topic for topic, level in signature if level == "Strong"]
 
     summary = []
 
@@ -165,10 +215,7 @@ def generate_recommendation_summary(skill_profile: dict) -> str:
     )
 
     return " ".join(summary)
+
+
 def explain_recommendation(topic, level, trend):
-    return f"""
-This recommendation was generated because:
-- Topic: {topic}
-- Skill level: {level}
-- Learning trend: {trend}
-"""
+    return topic_template(topic, level, trend).explanation
@@ -0,0 +1,287 @@
+"""
+scheduler.py
+------------
+Spaced-repetition review scheduling (SM-2).
+
+Responsibilities:
+- Keep a review card per student and item (topic or question) with its
+  interval, ease factor and next-due time
+- Update cards from quiz results using the SM-2 rules
+- Answer "what is due now" from an index on due time, so a lookup costs
+  O(log n) per returned item instead of a scan over every card
+- Persist cards to data/review_schedule.db (SQLite, shared by all processes)
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# =========================
+# FILE PATHS
+# =========================
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+SCHEDULE_FILE = DATA_DIR / "review_schedule.db"
+
+
+# =========================
+# CONFIG
+# =========================
+DAY_SECONDS = 24 * 60 * 60
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# SM-2 quality (0–5) for question reviews
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+
+# Seconds a writer waits for another process's transaction to finish
+DB_TIMEOUT = 30
+
+
+# Database files whose tables this process has already created
+_initialized: set = set()
+_lock = threading.Lock()
+
+
+# =========================
+# STORAGE
+# =========================
+# One row per card. A submission rewrites only the cards it reviews, inside
+# one transaction, so concurrent processes never overwrite each other and
+# the cost does not grow with the number of students. The due-time indexes
+# play the role of min-heaps: due queries walk only the due prefix.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    student_id TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    interval INTEGER NOT NULL,
+    ease REAL NOT NULL,
+    reps INTEGER NOT NULL,
+    due REAL NOT NULL,
+    PRIMARY KEY (student_id, item_key)
+);
+CREATE INDEX IF NOT EXISTS cards_student_due ON cards (student_id, due);
+CREATE INDEX IF NOT EXISTS cards_due ON cards (due);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    DATA_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(SCHEDULE_FILE, timeout=DB_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    with _lock:
+        if SCHEDULE_FILE not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _initialized.add(SCHEDULE_FILE)
+    return conn
+
+
+# =========================
+# SM-2 UPDATE
+# =========================
+def topic_key(topic: str) -> str:
+    return f"topic:{topic}"
+
+
+def question_key(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+def score_to_quality(score: float) -> int:
+    """
+    Map a 0–100 topic score to SM-2 quality 0–5.
+    """
+    return max(0, min(5, round(score / 20)))
+
+
+def _review(card: Optional[Dict], quality: int, now: float) -> Optional[Dict]:
+    """
+    Apply one SM-2 review to a card (None for a new item).
+
+    Returns:
+        dict: the updated card, or None if the review is skipped. Successful
+        reviews before the due time are skipped, so repeated quizzes in one
+        sitting do not keep stretching the interval. A failed review always
+        counts as a lapse, so a forgotten item comes back the next day.
+    """
+    if card is None:
+        card = {"interval": 0, "ease": INITIAL_EASE, "reps": 0, "due": now}
+    elif now < card["due"] and quality >= 3:
+        return None
+    else:
+        card = dict(card)
+
+    if quality < 3:
+        card["reps"] = 0
+        card["interval"] = 1
+    else:
+        card["reps"] += 1
+        if card["reps"] == 1:
+            card["interval"] = 1
+        elif card["reps"] == 2:
+            card["interval"] = 6
+        else:
+            card["interval"] = round(card["interval"] * card["ease"])
+
+    card["ease"] = max(
+        MIN_EASE,
+        card["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    )
+    card["due"] = now + card["interval"] * DAY_SECONDS
+    return card
+
+
+def record_quiz(
+    student_id: str,
+    skill_profile: Dict[str, Dict],
+    graded: Optional[List[Dict]] = None,
+    now: Optional[float] = None
+) -> None:
+    """
+    Schedule reviews from one quiz submission.
+
+    Only the student's reviewed cards are read and written, in a single
+    transaction.
+
+    Args:
+        student_id (str): profile student_id
+        skill_profile (dict): output of analyze_skill_gaps()
+        graded (list): optional output of quiz.grade_questions()
+        now (float): epoch seconds, defaults to the current time
+    """
+    now = time.time() if now is None else now
+
+    qualities = {
+        topic_key(topic): score_to_quality(data["score"])
+        for topic, data in skill_profile.items()
+    }
+    for item in graded or []:
+        qualities[question_key(item["id"])] = (
+            CORRECT_QUALITY if item["correct"] else WRONG_QUALITY
+        )
+    if not qualities:
+        return
+
+    placeholders = ", ".join("?" for _ in qualities)
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cards = {
+            row["item_key"]: dict(row)
+            for row in conn.execute(
+                "SELECT item_key, interval, ease, reps, due FROM cards "
+                f"WHERE student_id = ? AND item_key IN ({placeholders})",
+                [student_id, *qualities]
+            )
+        }
+
+        updates = []
+        for key, quality in qualities.items():
+            card = _review(cards.get(key), quality, now)
+            if card is not None:
+                updates.append((
+                    student_id, key,
+                    card["interval"], card["ease"], card["reps"], card["due"]
+                ))
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO cards "
+            "(student_id, item_key, interval, ease, reps, due) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            updates
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+# =========================
+# DUE QUERIES
+# =========================
+def next_due(student_id: str) -> Optional[Tuple[str, float]]:
+    """
+    The student's earliest-due item.
+
+    Returns:
+        tuple: (item_key, due epoch seconds), or None if nothing is scheduled
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT item_key, due FROM cards WHERE student_id = ? "
+            "ORDER BY due LIMIT 1",
+            (student_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    return (row["item_key"], row["due"]) if row else None
+
+
+def due_items(
+    student_id: str,
+    now: Optional[float] = None,
+    limit: Optional[int] = None
+) -> List[Dict]:
+    """
+    Items the student should review now, most overdue first.
+
+    Returns:
+        list of dict:
+            [
+                {"item": "topic:Loops", "due": 1769000000.0, "interval": 1, "ease": 2.18}
+            ]
+    """
+    now = time.time() if now is None else now
+
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT item_key, due, interval, ease FROM cards "
+            "WHERE student_id = ? AND due <= ? ORDER BY due LIMIT ?",
+            (student_id, now, -1 if limit is None else limit)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {"item": row["item_key"], "due": row["due"],
+         "interval": row["interval"], "ease": row["ease"]}
+        for row in rows
+    ]
+
+
+def due_today(now: Optional[float] = None) -> Dict[str, List[str]]:
+    """
+    Every student's items due before the end of the next 24 hours.
+
+    Walks only the due prefix of the due-time index, so it stays cheap
+    enough to run every minute when most cards are not due.
+
+    Returns:
+        dict: student_id -> list of item keys
+    """
+    now = time.time() if now is None else now
+
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT student_id, item_key FROM cards WHERE due <= ? ORDER BY due",
+            (now + DAY_SECONDS,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    result: Dict[str, List[str]] = {}
+    for row in rows:
+        result.setdefault(row["student_id"], []).append(row["item_key"])
+    return result
@@ -1,34 +1,402 @@
 import os
 os.environ["OLLAMA_NO_CUDA"] = "1"   # hard-disable GPU
 
+import json
+import queue
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import httpx
 import ollama
 
+from llm_router import LLMRouter
+
 # Primary and fallback models
 MODEL = "qwen2.5:3b"
 
 
+# =========================
+# GENERATION LIMITS
+# =========================
+# Wall-clock deadline (seconds) for a whole generation, per prompt type,
+# including time spent queued in ollama and prefilling the prompt
+DEADLINES = {
+    "tutor": 90,
+    "tutor_structured": 90,
+    "roadmap": 180,
+    "diagnosis": 90,
+    "question_gen": 240,
+}
+
+# Timeouts for the ollama HTTP client. ollama sends nothing while a request
+# waits in its queue or prefills, so there is no read timeout: call_llm
+# enforces the deadline of each call itself, which callers may raise.
+CONNECT_TIMEOUT = 5
+REQUEST_TIMEOUT = httpx.Timeout(None, connect=CONNECT_TIMEOUT)
+
+# Seconds between cancellation checks while waiting for the next chunk
+CANCEL_POLL_INTERVAL = 0.25
+
+# Upper bound on generated tokens, per prompt type. The structured tutor
+# budget covers the longest reply _tutor_schema() allows (about 1500
+# characters of values plus keys and punctuation) so valid JSON is not cut
+# off mid-object.
+NUM_PREDICT = {
+    "tutor": 512,
+    "tutor_structured": 640,
+    "roadmap": 1024,
+    "diagnosis": 384,
+    # Per batch of question_gen.DEFAULT_BATCH_SIZE questions; question_gen
+    # scales this and the deadline with the batch size.
+    "question_gen": 900,
+}
+
+# How long ollama keeps the model (and its prompt cache) resident after a
+# call. Unloading the model discards the cached system-prefix KV state.
+KEEP_ALIVE = "30m"
+
+# Requests are spread over the ollama servers listed in OLLAMA_HOSTS
+router = LLMRouter.from_hosts(timeout=REQUEST_TIMEOUT)
+if len(router.backends) > 1:
+    router.start_health_checks()
+
+
+class GenerationCancelled(Exception):
+    """
+    Raised when an in-flight generation is abandoned before completion.
+
+    Attributes:
+        partial (str): text generated before the generation was stopped
+    """
+
+    def __init__(self, message: str, partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class GenerationTimeout(GenerationCancelled):
+    """
+    Raised when a generation exceeds its deadline.
+    """
+
+
+class GenerationFailed(Exception):
+    """
+    Raised when no ollama backend could serve a generation.
+    """
+
+
+class MalformedGeneration(Exception):
+    """
+    Raised when structured output cannot be parsed into the expected fields.
+
+    Attributes:
+        raw (str): the unparsed model output
+    """
+
+    def __init__(self, message: str, raw: str = ""):
+        super().__init__(message)
+        self.raw = raw
+
+
+# =========================
+# CANCELLATION
+# =========================
+class CancelToken:
+    """
+    Cooperative cancellation flag checked between streamed chunks.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+# Only runs that are still executing hold a reference to their token, so
+# entries for finished runs and closed sessions drop out on their own.
+_run_tokens: "weakref.WeakValueDictionary[str, CancelToken]" = (
+    weakref.WeakValueDictionary()
+)
+_run_tokens_lock = threading.Lock()
+
+
+def begin_run(session_id: str) -> CancelToken:
+    """
+    Start a new script run for a session.
+
+    Any generation still attached to the session's previous run is
+    cancelled, since its output can no longer be shown. The caller must
+    keep the returned token alive for the duration of the run.
+
+    Args:
+        session_id (str): Streamlit session ID
+
+    Returns:
+        CancelToken: token for generations started during this run
+    """
+    token = CancelToken()
+    with _run_tokens_lock:
+        previous = _run_tokens.get(session_id)
+        _run_tokens[session_id] = token
+    if previous is not None:
+        previous.cancel()
+    return token
+
+
+# =========================
+# METRICS
+# =========================
+_metrics = {
+    "calls": 0,
+    "completed": 0,
+    "cancelled": 0,
+    "timed_out": 0,
+    "failed": 0,
+    "generated_tokens": 0,
+    "wasted_tokens": 0,
+}
+_metrics_lock = threading.Lock()
+
+
+def _record(outcome: str, tokens: int) -> None:
+    with _metrics_lock:
+        _metrics[outcome] += 1
+        _metrics["generated_tokens"] += tokens
+        if outcome != "completed":
+            _metrics["wasted_tokens"] += tokens
+
+
+def get_llm_metrics() -> Dict[str, int]:
+    """
+    Snapshot of generation counters.
+
+    wasted_tokens counts tokens produced by generations that were
+    cancelled, timed out or failed before their output was delivered.
+    """
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def get_backend_metrics() -> List[Dict]:
+    """
+    Per-backend queue depth and counters from the router.
+    """
+    return router.metrics()
+
+
 # =========================
 # CORE LLM CALL
 # =========================
-def call_llm(prompt: str) -> str:
-    response = ollama.chat(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response["message"]["content"].strip()
+def call_llm(
+    prompt: Union[str, List[Dict[str, str]]],
+    kind: str = "tutor",
+    cancel: Optional[CancelToken] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    deadline: Optional[float] = None,
+    format: Optional[Dict[str, Any]] = None,
+    affinity: Optional[str] = None,
+    num_predict: Optional[int] = None,
+) -> str:
+    """
+    Stream a completion from the local model.
+
+    Chunks are read on a helper thread, so cancellation and the deadline
+    are also enforced while waiting for the first token. Closing the
+    stream drops the HTTP connection, which makes ollama stop generating.
+
+    Args:
+        prompt (str | list): user prompt, or chat messages from a
+            build_*_prompt() helper
+        kind (str): prompt type, selects NUM_PREDICT and DEADLINES
+        cancel (CancelToken): optional cancellation token
+        on_chunk (callable): called with the accumulated text after each chunk
+        deadline (float): overrides the per-type deadline, in seconds
+        format (dict): optional JSON schema the output must follow
+        affinity (str): routing key; requests sharing it prefer the same
+            backend so its prompt cache is reused. Defaults to `kind`.
+        num_predict (int): overrides the per-type token budget
+
+    Returns:
+        str: generated text
+
+    Raises:
+        GenerationCancelled: the token was cancelled mid-generation
+        GenerationTimeout: the deadline passed mid-generation
+        GenerationFailed: no backend could serve the request
+    """
+    if deadline is None:
+        deadline = DEADLINES.get(kind, DEADLINES["tutor"])
+    if num_predict is None:
+        num_predict = NUM_PREDICT.get(kind, NUM_PREDICT["tutor"])
+    expires_at = time.monotonic() + deadline
+
+    if isinstance(prompt, str):
+        messages = [{"role": "user", "content": prompt}]
+    else:
+        messages = prompt
+
+    with _metrics_lock:
+        _metrics["calls"] += 1
+
+    # A backend that refuses the connection has produced nothing yet, so
+    # the request can safely move to the next backend. The router counts
+    # the error against that backend; the request itself fails only once
+    # every backend has refused it.
+    for attempt in range(len(router.backends)):
+        try:
+            return _stream_completion(
+                messages, num_predict, cancel, on_chunk, deadline, expires_at,
+                format, affinity or kind
+            )
+        except httpx.ConnectError as exc:
+            if attempt == len(router.backends) - 1:
+                _record("failed", 0)
+                raise GenerationFailed("No LLM backend is reachable") from exc
+        except httpx.TimeoutException as exc:
+            raise GenerationTimeout(
+                f"LLM backend did not respond within {deadline}s"
+            ) from exc
+        except (httpx.TransportError, ollama.ResponseError) as exc:
+            raise GenerationFailed(f"LLM backend error: {exc}") from exc
+
+
+_STREAM_END = object()
+
+
+def _pump(stream, chunks: queue.Queue, stop: threading.Event) -> None:
+    """
+    Move chunks from an ollama stream into a queue, on a helper thread.
+
+    Ends with _STREAM_END or the exception the stream raised. The stream is
+    closed here, by the thread iterating it, once `stop` is set.
+    """
+    try:
+        for chunk in stream:
+            if stop.is_set():
+                break
+            chunks.put(chunk)
+    except Exception as exc:
+        chunks.put(exc)
+    else:
+        chunks.put(_STREAM_END)
+    finally:
+        stream.close()
+
+
+def _stream_completion(
+    messages: List[Dict[str, str]],
+    num_predict: int,
+    cancel: Optional[CancelToken],
+    on_chunk: Optional[Callable[[str], None]],
+    deadline: float,
+    expires_at: float,
+    format: Optional[Dict[str, Any]],
+    affinity: str,
+) -> str:
+    parts = []
+    tokens = 0
+    outcome = "failed"
+
+    with router.acquire(affinity) as backend:
+        stream = backend.client.chat(
+            model=MODEL,
+            messages=messages,
+            stream=True,
+            keep_alive=KEEP_ALIVE,
+            format=format or "",
+            options={"num_predict": num_predict},
+        )
+        chunks: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        threading.Thread(
+            target=_pump, args=(stream, chunks, stop),
+            name="llm-stream", daemon=True
+        ).start()
+
+        try:
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    outcome = "cancelled"
+                    raise GenerationCancelled("Generation cancelled", "".join(parts))
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    outcome = "timed_out"
+                    raise GenerationTimeout(
+                        f"Generation exceeded {deadline}s deadline", "".join(parts)
+                    )
+
+                try:
+                    chunk = chunks.get(
+                        timeout=min(remaining, CANCEL_POLL_INTERVAL)
+                    )
+                except queue.Empty:
+                    continue
+                if chunk is _STREAM_END:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+
+                content = chunk["message"]["content"]
+                if content:
+                    parts.append(content)
+                    tokens += 1
+
+                if chunk.get("done"):
+                    tokens = chunk.get("eval_count") or tokens
+                    outcome = "completed"
+                    break
+
+                if on_chunk is not None:
+                    on_chunk("".join(parts))
+        except BaseException as exc:
+            # Streamlit stops a superseded or disconnected run by raising a
+            # BaseException from inside on_chunk; that is a cancellation too.
+            if outcome == "failed" and not isinstance(exc, Exception):
+                outcome = "cancelled"
+            # Refused connections are retried by call_llm, which records
+            # the outcome of the request as a whole
+            if isinstance(exc, httpx.ConnectError):
+                outcome = None
+            elif isinstance(exc, httpx.TimeoutException):
+                outcome = "timed_out"
+            raise
+        finally:
+            # _pump closes the stream once it sees the flag
+            stop.set()
+            if outcome is not None:
+                _record(outcome, tokens)
+            router.record_tokens(backend, tokens)
+
+    return "".join(parts).strip()
 
 
 # =========================
-# PROMPT BUILDERS (UNCHANGED)
+# PROMPT BUILDERS
 # =========================
-def build_tutor_prompt(topic: str, level: str) -> str:
-    return f"""
-You are an expert programming tutor.
+# Prompts are split into a static system message and a small user message
+# holding only the per-request data. Every prompt starts with the same
+# SHARED_PREFIX, so ollama can reuse the cached KV state for those tokens
+# instead of re-prefilling them on every call.
+SHARED_PREFIX = """You are part of an offline personalized learning assistant for
+programming students. Topics are Python fundamentals such as Basics, Loops
+and Functions. Student skill levels are Weak, Medium or Strong.
+Answer in clear, plain English suitable for the student's level.
+"""
 
-Topic: {topic}
-Student level: {level}
+TUTOR_SYSTEM = SHARED_PREFIX + """
+Role: expert programming tutor.
 
-Explain the topic clearly.
+Explain the given topic clearly.
 
 Include:
 1. Definition (1–2 lines)
@@ -43,19 +411,15 @@ Usage:
 YouTube searches:
 """
 
+ROADMAP_SYSTEM = SHARED_PREFIX + """
+Role: adaptive learning AI.
 
-def build_roadmap_prompt(skill_profile: dict) -> str:
-    return f"""
-You are an adaptive learning AI.
-
-Student data:
+You receive student data:
 - Skill gaps
 - Learning trends
 - Learning speed patterns
 - Quiz attempts
 
-{skill_profile}
-
 Generate a DAY-WISE adaptive learning plan.
 
 Rules:
@@ -64,32 +428,250 @@ Rules:
 - Declining topics → intervention focus
 """
 
+DIAGNOSIS_SYSTEM = SHARED_PREFIX + """
+Role: educational diagnostician.
 
-def build_diagnosis_prompt(topic: str, score: float, level: str) -> str:
-    return f"""
-You are an educational diagnostician.
-
-Topic: {topic}
-Score: {score}%
-Level: {level}
-
-Explain:
+Given a topic, score and level, explain:
 - Why the student is weak
 - Common mistakes
 - How to improve
 """
 
 
+TUTOR_STRUCTURED_SYSTEM = SHARED_PREFIX + """
+Role: expert programming tutor.
+
+Explain the given topic clearly and briefly. Respond with a JSON object:
+- definition: 1–2 lines
+- explanation: brief explanation with a short example
+- usage: where it is used
+- youtube_searches: 2–3 YouTube search phrases
+
+If the request says the definition is already known, leave it out.
+"""
+
+
+QUESTION_GEN_SYSTEM = SHARED_PREFIX + """
+Role: assessment author.
+
+Write new multiple-choice questions for a diagnostic programming quiz.
+Respond with a JSON object containing a "questions" list. Each question has:
+- question: the question text
+- option1, option2, option3, option4: four distinct answer options
+- answer: an exact copy of the correct option
+
+Rules:
+- Exactly one option is correct
+- Match the requested topic, difficulty and Bloom's taxonomy level
+- Every question must test something different
+"""
+
+
+def _messages(system: str, user: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def build_tutor_prompt(topic: str, level: str) -> List[Dict[str, str]]:
+    return _messages(
+        TUTOR_SYSTEM,
+        f"Topic: {topic}\nStudent level: {level}"
+    )
+
+
+def build_roadmap_prompt(skill_profile: dict) -> List[Dict[str, str]]:
+    return _messages(
+        ROADMAP_SYSTEM,
+        f"Student data:\n{skill_profile}"
+    )
+
+
+def build_diagnosis_prompt(
+    topic: str, score: float, level: str
+) -> List[Dict[str, str]]:
+    return _messages(
+        DIAGNOSIS_SYSTEM,
+        f"Topic: {topic}\nScore: {score}%\nLevel: {level}"
+    )
+
+
+def build_question_gen_prompt(
+    topic: str, difficulty: str, bloom: str, count: int
+) -> List[Dict[str, str]]:
+    return _messages(
+        QUESTION_GEN_SYSTEM,
+        f"Topic: {topic}\nDifficulty: {difficulty}\n"
+        f"Bloom level: {bloom}\nNumber of questions: {count}"
+    )
+
+
 # =========================
-# PUBLIC FUNCTIONS (UNCHANGED)
+# STRUCTURED TUTOR OUTPUT
 # =========================
-def get_ai_explanation(topic: str, level: str) -> str:
-    return call_llm(build_tutor_prompt(topic, level))
+@dataclass(frozen=True)
+class TutorExplanation:
+    """
+    Tutor answer split into the sections app.py renders.
+    """
+    definition: str
+    explanation: str
+    usage: str
+    youtube_searches: Tuple[str, ...]
+
+
+# Definitions do not depend on the student's level, so one generated
+# definition per topic is reused by every later request for that topic.
+_definition_cache: Dict[str, str] = {}
+_definition_lock = threading.Lock()
+
+
+def _tutor_schema(include_definition: bool) -> Dict[str, Any]:
+    properties = {
+        "explanation": {"type": "string", "maxLength": 700},
+        "usage": {"type": "string", "maxLength": 300},
+        "youtube_searches": {
+            "type": "array",
+            "items": {"type": "string", "maxLength": 80},
+            "maxItems": 3,
+        },
+    }
+    if include_definition:
+        properties = {
+            "definition": {"type": "string", "maxLength": 250},
+            **properties,
+        }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+    }
 
 
-def generate_learning_roadmap(skill_profile: dict) -> str:
-    return call_llm(build_roadmap_prompt(skill_profile))
+def _salvage_fields(raw: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Recover the fields of a truncated JSON object that were fully written.
 
+    Each schema key is located in the raw text and its value decoded on its
+    own; a value cut off mid-way fails to decode and is left out.
+    """
+    decoder = json.JSONDecoder()
+    data = {}
+    for name, spec in schema["properties"].items():
+        match = re.search(rf'"{re.escape(name)}"\s*:\s*', raw)
+        if match is None:
+            continue
+        try:
+            value, _ = decoder.raw_decode(raw, match.end())
+        except json.JSONDecodeError:
+            continue
+        expected = list if spec["type"] == "array" else str
+        if isinstance(value, expected):
+            data[name] = value
+    return data
 
-def explain_skill_gap(topic: str, score: float, level: str) -> str:
-    return call_llm(build_diagnosis_prompt(topic, score, level))
+
+def build_structured_tutor_prompt(
+    topic: str, level: str, include_definition: bool = True
+) -> List[Dict[str, str]]:
+    user = f"Topic: {topic}\nStudent level: {level}"
+    if not include_definition:
+        user += "\nThe definition is already known."
+    return _messages(TUTOR_STRUCTURED_SYSTEM, user)
+
+
+def get_structured_explanation(
+    topic: str,
+    level: str,
+    cancel: Optional[CancelToken] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> TutorExplanation:
+    """
+    Generate a tutor explanation as JSON and parse it into sections.
+
+    The definition is only generated the first time a topic is requested;
+    afterwards it comes from the definition cache.
+
+    Returns:
+        TutorExplanation
+
+    Raises:
+        MalformedGeneration: the reply has no usable explanation
+    """
+    with _definition_lock:
+        definition = _definition_cache.get(topic)
+
+    schema = _tutor_schema(definition is None)
+    raw = call_llm(
+        build_structured_tutor_prompt(topic, level, definition is None),
+        kind="tutor_structured",
+        cancel=cancel,
+        on_chunk=on_chunk,
+        format=schema,
+        affinity=f"tutor:{topic}",
+    )
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        # Output was cut off; keep only the fields that were completed
+        data = _salvage_fields(raw, schema)
+    if not isinstance(data, dict) or not data.get("explanation"):
+        raise MalformedGeneration("Tutor reply has no explanation", raw)
+
+    if definition is None:
+        definition = str(data.get("definition", "")).strip()
+        if definition:
+            with _definition_lock:
+                _definition_cache[topic] = definition
+
+    return TutorExplanation(
+        definition=definition,
+        explanation=str(data.get("explanation", "")).strip(),
+        usage=str(data.get("usage", "")).strip(),
+        youtube_searches=tuple(
+            str(q).strip() for q in data.get("youtube_searches", []) if q
+        ),
+    )
+
+
+# =========================
+# PUBLIC FUNCTIONS
+# =========================
+def get_ai_explanation(
+    topic: str,
+    level: str,
+    cancel: Optional[CancelToken] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> str:
+    return call_llm(
+        build_tutor_prompt(topic, level),
+        kind="tutor", cancel=cancel, on_chunk=on_chunk,
+        affinity=f"tutor:{topic}"
+    )
+
+
+def generate_learning_roadmap(
+    skill_profile: dict,
+    cancel: Optional[CancelToken] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> str:
+    return call_llm(
+        build_roadmap_prompt(skill_profile),
+        kind="roadmap", cancel=cancel, on_chunk=on_chunk
+    )
+
+
+def explain_skill_gap(
+    topic: str,
+    score: float,
+    level: str,
+    cancel: Optional[CancelToken] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> str:
+    return call_llm(
+        build_diagnosis_prompt(topic, score, level),
+        kind="diagnosis", cancel=cancel, on_chunk=on_chunk,
+        affinity=f"diagnosis:{topic}"
+    )